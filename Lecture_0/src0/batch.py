@@ -0,0 +1,78 @@
+"""
+Solve many maze files in one process pool.
+
+    python batch.py mazes/ [workers] [mode]
+    python batch.py manifest.txt [workers] [mode]
+
+The input is either a directory, whose .txt files are all solved, or a
+manifest listing one maze file per line (relative paths are taken from the
+manifest's directory). Results are printed as JSON lines in the order the
+mazes finish.
+"""
+
+import json
+import os
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from compact import CompactMaze
+
+
+def maze_files(path):
+    """Returns the maze files named by a directory or a manifest."""
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.endswith(".txt")
+        )
+    directory = os.path.dirname(path)
+    with open(path) as f:
+        return [
+            os.path.join(directory, line.strip()) for line in f
+            if line.strip() and not line.startswith("#")
+        ]
+
+
+def solve_file(filename, mode):
+    """Solves one maze file and returns a JSON-ready summary."""
+    result = {"file": filename, "mode": mode}
+    start = time.perf_counter()
+    m = None
+    try:
+        m = CompactMaze(filename)
+        m.solve(mode)
+        result["solved"] = True
+        result["path_length"] = len(m.solution[0])
+    except Exception as e:
+        result["solved"] = False
+        result["path_length"] = None
+        if str(e) != "no solution":
+            result["error"] = str(e)
+    result["num_explored"] = getattr(m, "num_explored", None)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def solve_all(filenames, mode="bfs", workers=None):
+    """Yields one result per file, in the order they finish."""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(solve_file, filename, mode)
+                   for filename in filenames]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main():
+    if len(sys.argv) not in [2, 3, 4]:
+        sys.exit("Usage: python batch.py directory|manifest [workers] [mode]")
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    mode = sys.argv[3] if len(sys.argv) > 3 else "bfs"
+
+    for result in solve_all(maze_files(sys.argv[1]), mode, workers):
+        print(json.dumps(result), flush=True)
+
+
+if __name__ == "__main__":
+    main()
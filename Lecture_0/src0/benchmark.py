@@ -0,0 +1,88 @@
+"""
+Benchmark every maze solver mode over a sweep of generated maze sizes.
+
+    python benchmark.py [size ...]
+
+For each generator in generate.py and each size, writes a seeded square
+maze to a temporary file, solves it with every mode in SOLVERS (plus the
+CompactMaze breadth- and depth-first searches) and prints one CSV row with
+the time, states explored, solution length and peak traced memory.
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+
+from compact import CompactMaze
+from generate import GENERATORS, generate, write_maze
+from instrument import SearchStats
+from maze import SOLVERS, Maze
+
+SIZES = [51, 101, 201, 401]
+SEED = 0
+
+# Modes that only make sense on small mazes
+SLOW = {"dfs": 201}
+
+
+def run(cls, filename, mode):
+    """
+    Solves the maze twice: once for timing, once under tracemalloc for the
+    memory peak. Returns a dict of results.
+    """
+    m = cls(filename)
+    start = time.perf_counter()
+    try:
+        m.solve(mode)
+        length = len(m.solution[0])
+    except Exception as e:
+        if str(e) != "no solution":
+            raise
+        length = None
+    seconds = time.perf_counter() - start
+
+    traced = cls(filename)
+    traced.stats = SearchStats(track_memory=True)
+    try:
+        traced.solve(mode)
+    except Exception:
+        pass
+
+    return {
+        "seconds": f"{seconds:.4f}",
+        "num_explored": m.num_explored,
+        "solution_length": length,
+        "peak_memory": traced.stats.records[0]["peak_memory"],
+    }
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    modes = [(Maze, mode) for mode in SOLVERS]
+    modes += [(CompactMaze, "bfs"), (CompactMaze, "dfs")]
+
+    writer = csv.DictWriter(sys.stdout, fieldnames=[
+        "generator", "size", "maze", "mode", "seconds", "num_explored",
+        "solution_length", "peak_memory",
+    ])
+    writer.writeheader()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for kind in GENERATORS:
+            for size in sizes:
+                filename = os.path.join(directory, f"{kind}{size}.txt")
+                write_maze(filename, *generate(kind, size, size, SEED))
+                for cls, mode in modes:
+                    if size > SLOW.get(mode, size):
+                        continue
+                    row = {"generator": kind, "size": size,
+                           "maze": cls.__name__, "mode": mode}
+                    row.update(run(cls, filename, mode))
+                    writer.writerow(row)
+                    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+"""
+Compact maze representation for very large mazes.
+
+Walls are stored eight cells to a byte, cells are addressed by integer id
+(row * width + col), and the search bookkeeping lives in one byte per cell
+instead of sets of (row, col) tuples and Node objects.
+"""
+
+import locale
+import mmap
+import sys
+
+import numpy as np
+
+from collections import deque
+
+from maze import Maze
+
+# Per-cell search codes: the low bits hold the direction back to the parent,
+# the high bit marks the cell as explored (removed from the frontier)
+UNSEEN = 0
+FROM_BELOW = 1
+FROM_ABOVE = 2
+FROM_RIGHT = 3
+FROM_LEFT = 4
+ROOT = 5
+PARENT = 0x7
+EXPLORED = 0x8
+
+
+class BitGrid():
+    """
+    Grid of booleans packed eight to a byte.
+
+    Reads like a list of lists: grid[i][j] and grid[i, j] both work, and
+    iterating yields one unpacked row at a time.
+    """
+
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.stride = (width + 7) // 8
+        self.bits = np.zeros((height, self.stride), dtype=np.uint8)
+        self.flat = memoryview(self.bits.reshape(-1))
+
+    @classmethod
+    def from_array(cls, array):
+        """Packs a two-dimensional boolean array into a new grid."""
+        height, width = array.shape
+        grid = cls(height, width)
+        grid.bits[:] = np.packbits(array, axis=1)
+        return grid
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            i, j = key
+            return bool(self.flat[i * self.stride + (j >> 3)] >> (7 - (j & 7)) & 1)
+        return self.row(key)
+
+    def __iter__(self):
+        for i in range(self.height):
+            yield self.row(i)
+
+    def row(self, i):
+        """Returns row i as an unpacked boolean array."""
+        return np.unpackbits(self.bits[i], count=self.width).astype(bool)
+
+    def set(self, i, j, value):
+        index = i * self.stride + (j >> 3)
+        mask = 1 << (7 - (j & 7))
+        if value:
+            self.flat[index] |= mask
+        else:
+            self.flat[index] &= ~mask & 0xFF
+
+    def unpack(self):
+        """Returns the whole grid as a two-dimensional boolean array."""
+        return np.unpackbits(self.bits, axis=1, count=self.width).astype(bool)
+
+
+class CellMask():
+    """
+    Read-only set-like view of the cells whose search code has `flag` set,
+    so callers can keep writing `(i, j) in maze.explored`.
+    """
+
+    def __init__(self, codes, width, flag):
+        self.codes = codes
+        self.width = width
+        self.flag = flag
+
+    def __contains__(self, cell):
+        i, j = cell
+        return bool(self.codes[i * self.width + j] & self.flag)
+
+    def __iter__(self):
+        for cell_id, code in enumerate(self.codes):
+            if code & self.flag:
+                yield divmod(cell_id, self.width)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.mask()))
+
+    def mask(self, top=0, bottom=None, left=0, right=None):
+        """Returns the view, or a region of it, as a two-dimensional boolean array."""
+        codes = np.frombuffer(self.codes, dtype=np.uint8).reshape(-1, self.width)
+        return (codes[top:bottom, left:right] & self.flag).astype(bool)
+
+
+def load_walls(filename, use_mmap=False):
+    """
+    Streams a maze file into a BitGrid one line at a time, validating the
+    start and goal in the same pass. Returns (walls, start, goal).
+
+    The file is read as bytes, one cell per byte, so only the packed rows
+    are ever held in memory. Lines with non-ASCII characters (such as the
+    "█" Maze.print draws) are decoded as Maze would read them, so each
+    character is still one cell. With use_mmap the file is memory-mapped
+    instead of read through a buffered file object.
+    """
+    encoding = locale.getpreferredencoding(False)
+    rows = []
+    start = goal = None
+    starts = goals = 0
+    width = 0
+
+    with open(filename, "rb") as f:
+        if use_mmap and f.seek(0, 2) > 0:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            lines = iter(source.readline, b"")
+        else:
+            source = None
+            f.seek(0)
+            lines = f
+
+        for i, line in enumerate(lines):
+            line = line.rstrip(b"\r\n")
+            if not line.isascii():
+                line = "".join(
+                    c if c in " AB" else "#" for c in line.decode(encoding)
+                ).encode()
+
+            # Validate start and goal
+            count = line.count(b"A")
+            if count:
+                starts += count
+                if starts > 1:
+                    raise Exception("maze must have exactly one start point")
+                start = (i, line.index(b"A"))
+            count = line.count(b"B")
+            if count:
+                goals += count
+                if goals > 1:
+                    raise Exception("maze must have exactly one goal")
+                goal = (i, line.index(b"B"))
+
+            # Pack this row's walls
+            chars = np.frombuffer(line, dtype=np.uint8)
+            rows.append(np.packbits(
+                (chars != ord(" ")) & (chars != ord("A")) & (chars != ord("B"))
+            ))
+            width = max(width, len(line))
+
+        if source is not None:
+            source.close()
+
+    if start is None:
+        raise Exception("maze must have exactly one start point")
+    if goal is None:
+        raise Exception("maze must have exactly one goal")
+
+    # Rows shorter than the widest one are open past their end
+    walls = BitGrid(len(rows), width)
+    for i, row in enumerate(rows):
+        walls.bits[i, :len(row)] = row
+    return walls, start, goal
+
+
+class CompactMaze(Maze):
+
+    def __init__(self, filename, use_mmap=False):
+        self.walls, self.start, self.goal = load_walls(filename, use_mmap)
+        self.height = self.walls.height
+        self.width = self.walls.width
+        self.solution = None
+        self.distances = None
+        self.toward = None
+        self.planner = None
+        self.clusters = None
+        self.components = None
+        self.indexed = False
+        self.stats = None
+
+    def print(self):
+        solution = set(self.solution[1]) if self.solution is not None else set()
+        print()
+        for i, row in enumerate(self.walls):
+            for j, col in enumerate(row):
+                if col:
+                    print("█", end="")
+                elif (i, j) == self.start:
+                    print("A", end="")
+                elif (i, j) == self.goal:
+                    print("B", end="")
+                elif (i, j) in solution:
+                    print("*", end="")
+                else:
+                    print(" ", end="")
+            print()
+        print()
+
+    def is_open(self, row, col):
+        """Returns True if (row, col) is inside the maze and not a wall."""
+        return 0 <= row < self.height and 0 <= col < self.width and not self.walls[row, col]
+
+    def neighbors(self, state):
+        row, col = state
+        candidates = [
+            ("up", (row - 1, col)),
+            ("down", (row + 1, col)),
+            ("left", (row, col - 1)),
+            ("right", (row, col + 1))
+        ]
+
+        result = []
+        for action, (r, c) in candidates:
+            if 0 <= r < self.height and 0 <= c < self.width and not self.walls[r, c]:
+                result.append((action, (r, c)))
+        return result
+
+    def solve(self, mode="bfs"):
+        """
+        Finds a solution to maze, if one exists.
+
+        Breadth- and depth-first search run on integer cell ids with one
+        byte of bookkeeping per cell; other modes fall back to Maze.solve.
+        """
+        if mode not in ["bfs", "dfs"]:
+            return super().solve(mode)
+
+        solution = None
+        if self.stats is not None:
+            self.stats.begin(self, mode)
+        try:
+            solution = self.solve_ids(mode)
+        finally:
+            if self.stats is not None:
+                self.stats.end(self, solution)
+
+        if solution is None:
+            raise Exception("no solution")
+        self.solution = solution
+
+    def solve_ids(self, mode):
+        """
+        Breadth- or depth-first search over integer cell ids.
+        Returns the solution, or None if there is no path.
+        """
+        height, width = self.height, self.width
+        flat, stride = self.walls.flat, self.walls.stride
+        codes = bytearray(height * width)
+        start = self.start[0] * width + self.start[1]
+        goal = self.goal[0] * width + self.goal[1]
+
+        # Keep track of number of states explored
+        self.num_explored = 0
+        self.explored = CellMask(codes, width, EXPLORED)
+        if self.unreachable(self.start, self.goal):
+            return None
+
+        frontier = deque([start])
+        remove = frontier.popleft if mode == "bfs" else frontier.pop
+        codes[start] = ROOT
+        stats = self.stats
+
+        while frontier:
+            cell = remove()
+            self.num_explored += 1
+            if stats is not None:
+                stats.expanded(divmod(cell, width), len(frontier), neighbors=True)
+            if cell == goal:
+                return self.backtrack(codes, goal)
+            codes[cell] |= EXPLORED
+
+            row, col = divmod(cell, width)
+            for neighbor, r, c, code in (
+                (cell - width, row - 1, col, FROM_BELOW),
+                (cell + width, row + 1, col, FROM_ABOVE),
+                (cell - 1, row, col - 1, FROM_RIGHT),
+                (cell + 1, row, col + 1, FROM_LEFT),
+            ):
+                if (0 <= r < height and 0 <= c < width and not codes[neighbor]
+                        and not flat[r * stride + (c >> 3)] >> (7 - (c & 7)) & 1):
+                    codes[neighbor] = code
+                    frontier.append(neighbor)
+
+        return None
+
+    def backtrack(self, codes, cell):
+        """Follows parent codes from cell back to the root."""
+        width = self.width
+        steps = {
+            FROM_BELOW: (width, "up"),
+            FROM_ABOVE: (-width, "down"),
+            FROM_RIGHT: (1, "left"),
+            FROM_LEFT: (-1, "right"),
+        }
+        actions = []
+        cells = []
+        while codes[cell] & PARENT != ROOT:
+            offset, action = steps[codes[cell] & PARENT]
+            actions.append(action)
+            cells.append(divmod(cell, width))
+            cell += offset
+        actions.reverse()
+        cells.reverse()
+        return (actions, cells)
+
+    def set_wall(self, cell, wall=True):
+        """Adds or removes the wall at cell."""
+        i, j = cell
+        self.walls.set(i, j, wall)
+        self.invalidate(cell)
+
+    def distance_field(self):
+        """
+        Breadth-first search outward from the goal, caching one parent code
+        per cell that points one step closer to the goal. Distances are not
+        stored; they are counted while walking the path.
+        """
+        if self.toward is not None:
+            return
+
+        height, width = self.height, self.width
+        flat, stride = self.walls.flat, self.walls.stride
+        codes = bytearray(height * width)
+        goal = self.goal[0] * width + self.goal[1]
+        codes[goal] = ROOT
+
+        frontier = deque([goal])
+        while frontier:
+            cell = frontier.popleft()
+            row, col = divmod(cell, width)
+            for neighbor, r, c, code in (
+                (cell - width, row - 1, col, FROM_BELOW),
+                (cell + width, row + 1, col, FROM_ABOVE),
+                (cell - 1, row, col - 1, FROM_RIGHT),
+                (cell + 1, row, col + 1, FROM_LEFT),
+            ):
+                if (0 <= r < height and 0 <= c < width and not codes[neighbor]
+                        and not flat[r * stride + (c >> 3)] >> (7 - (c & 7)) & 1):
+                    codes[neighbor] = code
+                    frontier.append(neighbor)
+
+        self.toward = codes
+
+    def reaches_goal(self, cell):
+        """Returns True if the cached field has a path from cell to the goal."""
+        self.distance_field()
+        i, j = cell
+        return bool(self.toward[i * self.width + j])
+
+    def distance_from(self, cell):
+        """Returns the length of a shortest path from cell to the goal, or None."""
+        if not self.reaches_goal(cell):
+            return None
+        return len(self.path_from(cell)[0])
+
+    def path_from(self, cell):
+        """Returns a shortest path (actions, cells) from cell to the goal."""
+        if not self.reaches_goal(cell):
+            raise Exception("no solution")
+
+        width = self.width
+        steps = {
+            FROM_BELOW: (width, "down"),
+            FROM_ABOVE: (-width, "up"),
+            FROM_RIGHT: (1, "right"),
+            FROM_LEFT: (-1, "left"),
+        }
+        codes = self.toward
+        cell = cell[0] * width + cell[1]
+        actions = []
+        cells = []
+        while codes[cell] != ROOT:
+            offset, action = steps[codes[cell]]
+            cell += offset
+            actions.append(action)
+            cells.append(divmod(cell, width))
+        return (actions, cells)
+
+    def paths_from(self, cells):
+        """Returns path_from for each cell, None where unreachable."""
+        return [self.path_from(cell) if self.reaches_goal(cell) else None
+                for cell in cells]
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python compact.py maze.txt [mode]")
+    mode = sys.argv[2] if len(sys.argv) == 3 else "bfs"
+
+    m = CompactMaze(sys.argv[1])
+    print("Solving...")
+    m.solve(mode)
+    print("States Explored:", m.num_explored)
+    print("Solution length:", len(m.solution[0]))
+
+
+if __name__ == "__main__":
+    main()
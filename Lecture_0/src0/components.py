@@ -0,0 +1,63 @@
+"""
+Connectivity index for mazes: a union-find over cell ids that tells in
+near-constant time whether two cells lie in the same open region.
+
+Removing a wall only ever merges regions, so the index absorbs it with a
+few unions. Adding a wall can split a region, which union-find cannot
+undo; the maze drops the index and rebuilds it on the next query.
+"""
+
+from array import array
+
+
+class ConnectivityIndex():
+
+    def __init__(self, maze):
+        self.maze = maze
+        self.width = maze.width
+        count = maze.height * maze.width
+        self.parents = array("i", range(count))
+        self.sizes = array("i", [1]) * count
+
+        # Join every open cell to its open neighbors below and to the right
+        above = None
+        for i in range(maze.height):
+            row = [not wall for wall in maze.walls[i]]
+            base = i * self.width
+            for j, cell_open in enumerate(row):
+                if not cell_open:
+                    continue
+                if j > 0 and row[j - 1]:
+                    self.union(base + j - 1, base + j)
+                if above is not None and above[j]:
+                    self.union(base - self.width + j, base + j)
+            above = row
+
+    def find(self, cell_id):
+        parents = self.parents
+        while parents[cell_id] != cell_id:
+            parents[cell_id] = parents[parents[cell_id]]
+            cell_id = parents[cell_id]
+        return cell_id
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.sizes[a] < self.sizes[b]:
+            a, b = b, a
+        self.parents[b] = a
+        self.sizes[a] += self.sizes[b]
+
+    def connected(self, a, b):
+        """Returns True if there is an open path between cells a and b."""
+        if not (self.maze.is_open(*a) and self.maze.is_open(*b)):
+            return False
+        return (self.find(a[0] * self.width + a[1])
+                == self.find(b[0] * self.width + b[1]))
+
+    def opened(self, cell):
+        """Merges cell, whose wall was just removed, with its open neighbors."""
+        i, j = cell
+        for _, (r, c) in self.maze.neighbors(cell):
+            self.union(i * self.width + j, r * self.width + c)
@@ -0,0 +1,164 @@
+"""
+Seeded generator for large mazes in the maze.txt text format.
+
+    python generate.py backtracker|prim|rooms height width output.txt [seed] [density]
+
+backtracker and prim carve perfect mazes (exactly one path between any two
+cells) on the odd rows and columns. rooms builds an open floor plan of
+rooms joined by doorways and scatters single-cell obstacles over it with
+the given density.
+"""
+
+import random
+import sys
+
+ROOM_SIZE = 12
+
+
+def carved(height, width):
+    """Returns a grid that is all wall, plus the list of carvable cells."""
+    walls = [[True] * width for _ in range(height)]
+    cells = [(i, j) for i in range(1, height - 1, 2) for j in range(1, width - 1, 2)]
+    return walls, cells
+
+
+def recursive_backtracker(height, width, rng):
+    """Carves a maze with an iterative depth-first random walk."""
+    walls, cells = carved(height, width)
+    start = cells[0]
+    walls[start[0]][start[1]] = False
+    stack = [start]
+    while stack:
+        i, j = stack[-1]
+        options = [
+            (i + di, j + dj) for di, dj in [(-2, 0), (2, 0), (0, -2), (0, 2)]
+            if 0 < i + di < height - 1 and 0 < j + dj < width - 1
+            and walls[i + di][j + dj]
+        ]
+        if not options:
+            stack.pop()
+            continue
+        r, c = rng.choice(options)
+        walls[(i + r) // 2][(j + c) // 2] = False
+        walls[r][c] = False
+        stack.append((r, c))
+    return walls
+
+
+def prim(height, width, rng):
+    """Carves a maze with randomized Prim's algorithm."""
+    walls, cells = carved(height, width)
+    start = cells[0]
+    walls[start[0]][start[1]] = False
+    frontier = []
+
+    def add_edges(i, j):
+        for di, dj in [(-2, 0), (2, 0), (0, -2), (0, 2)]:
+            if 0 < i + di < height - 1 and 0 < j + dj < width - 1:
+                frontier.append(((i, j), (i + di, j + dj)))
+
+    add_edges(*start)
+    while frontier:
+        index = rng.randrange(len(frontier))
+        frontier[index], frontier[-1] = frontier[-1], frontier[index]
+        (i, j), (r, c) = frontier.pop()
+        if walls[r][c]:
+            walls[(i + r) // 2][(j + c) // 2] = False
+            walls[r][c] = False
+            add_edges(r, c)
+    return walls
+
+
+def rooms(height, width, rng, density=0.2, room_size=ROOM_SIZE):
+    """
+    Splits the floor into rooms with one doorway in every dividing wall,
+    with obstacles scattered over the floor with probability density.
+    Cells on either side of a doorway are kept clear.
+    """
+    walls = [[rng.random() < density for _ in range(width)] for _ in range(height)]
+    for i in range(0, height, room_size):
+        for j in range(width):
+            walls[i][j] = True
+    for j in range(0, width, room_size):
+        for i in range(height):
+            walls[i][j] = True
+    for i in range(height):
+        walls[i][width - 1] = True
+    for j in range(width):
+        walls[height - 1][j] = True
+
+    # Doorways in each room's top and left walls
+    for top in range(0, height - 1, room_size):
+        for left in range(0, width - 1, room_size):
+            bottom = min(top + room_size, height - 1)
+            right = min(left + room_size, width - 1)
+            if top > 0 and right - left > 1:
+                j = rng.randrange(left + 1, right)
+                for i in [top - 1, top, top + 1]:
+                    walls[i][j] = False
+            if left > 0 and bottom - top > 1:
+                i = rng.randrange(top + 1, bottom)
+                for j in [left - 1, left, left + 1]:
+                    walls[i][j] = False
+    return walls
+
+
+GENERATORS = {
+    "backtracker": recursive_backtracker,
+    "prim": prim,
+    "rooms": rooms,
+}
+
+
+def endpoints(walls):
+    """Returns the first and last open cells in reading order."""
+    open_cells = [(i, j) for i, row in enumerate(walls)
+                  for j, wall in enumerate(row) if not wall]
+    if len(open_cells) < 2:
+        raise Exception("maze is too small")
+    return open_cells[0], open_cells[-1]
+
+
+def generate(kind, height, width, seed=0, density=0.2):
+    """Returns (walls, start, goal) for a new maze."""
+    rng = random.Random(seed)
+    if kind == "rooms":
+        walls = rooms(height, width, rng, density)
+    else:
+        walls = GENERATORS[kind](height, width, rng)
+    start, goal = endpoints(walls)
+    walls[start[0]][start[1]] = False
+    walls[goal[0]][goal[1]] = False
+    return walls, start, goal
+
+
+def write_maze(filename, walls, start, goal):
+    """Writes a maze in the text format Maze reads."""
+    with open(filename, "w") as f:
+        for i, row in enumerate(walls):
+            line = ["#" if wall else " " for wall in row]
+            if i == start[0]:
+                line[start[1]] = "A"
+            if i == goal[0]:
+                line[goal[1]] = "B"
+            f.write("".join(line) + "\n")
+
+
+def main():
+    if len(sys.argv) not in [5, 6, 7]:
+        sys.exit(
+            f"Usage: python generate.py {'|'.join(GENERATORS)} "
+            "height width output.txt [seed] [density]"
+        )
+    kind = sys.argv[1]
+    height, width = int(sys.argv[2]), int(sys.argv[3])
+    seed = int(sys.argv[5]) if len(sys.argv) > 5 else 0
+    density = float(sys.argv[6]) if len(sys.argv) > 6 else 0.2
+    if kind not in GENERATORS:
+        sys.exit(f"Unknown maze kind: {kind}")
+
+    write_maze(sys.argv[4], *generate(kind, height, width, seed, density))
+
+
+if __name__ == "__main__":
+    main()
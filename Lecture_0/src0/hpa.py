@@ -0,0 +1,254 @@
+"""
+Hierarchical pathfinding (HPA*) for large mazes that answer many queries.
+
+Preprocessing cuts the maze into square clusters, places entrances on the
+open stretches of every border between neighboring clusters and stores the
+distance between every pair of entrances inside the same cluster. A query
+connects start and goal to the entrances of their own clusters, runs A* on
+that small abstract graph and then refines each abstract edge with a
+breadth-first search confined to one cluster. Paths are near-optimal: they
+are shortest among paths that pass through the chosen entrances.
+
+Run as a script to build (or load) the graph and solve a maze with it:
+
+    python hpa.py maze.txt graph.json [cluster size]
+"""
+
+import heapq
+import itertools
+import json
+import os
+import sys
+
+from collections import deque
+
+from maze import Maze, direction, manhattan
+
+# Border openings at least this long get an entrance at each end
+LONG_ENTRANCE = 6
+
+
+class ClusterGraph():
+
+    def __init__(self, maze, cluster_size=16, build=True):
+        self.maze = maze
+        self.cluster_size = cluster_size
+        self.edges = dict()
+        self.members = dict()
+        self.num_explored = 0
+        if build:
+            self.build()
+
+    def cluster(self, cell):
+        """Returns the (row, col) index of the cluster containing cell."""
+        return (cell[0] // self.cluster_size, cell[1] // self.cluster_size)
+
+    def bounds(self, cluster):
+        """Returns (top, bottom, left, right) of a cluster, ends exclusive."""
+        size = self.cluster_size
+        top, left = cluster[0] * size, cluster[1] * size
+        return (top, min(top + size, self.maze.height),
+                left, min(left + size, self.maze.width))
+
+    def connect(self, a, b, cost):
+        for x, y in [(a, b), (b, a)]:
+            self.edges.setdefault(x, dict())[y] = cost
+            self.members.setdefault(self.cluster(x), set()).add(x)
+
+    def build(self):
+        """Finds all entrances, then links entrances within each cluster."""
+        maze = self.maze
+        size = self.cluster_size
+
+        # Entrances across vertical borders, then across horizontal borders
+        for col in range(size - 1, maze.width - 1, size):
+            self.add_entrances([((row, col), (row, col + 1))
+                                for row in range(maze.height)])
+        for row in range(size - 1, maze.height - 1, size):
+            self.add_entrances([((row, col), (row + 1, col))
+                                for col in range(maze.width)])
+
+        # Intra-cluster distances between entrances
+        for cluster, members in list(self.members.items()):
+            cells = sorted(members)
+            for i, cell in enumerate(cells):
+                distances, _ = self.local_search(cell, cluster, set(cells[i + 1:]))
+                for other in cells[i + 1:]:
+                    if other in distances:
+                        self.connect(cell, other, distances[other])
+
+    def add_entrances(self, pairs):
+        """
+        Adds entrances for every run of open pairs along one border,
+        splitting runs where the border passes a cluster corner.
+        """
+        run = []
+        for a, b in pairs + [(None, None)]:
+            if a is not None and self.maze.is_open(*a) and self.maze.is_open(*b) and (
+                not run or self.cluster(a) == self.cluster(run[0][0])
+            ):
+                run.append((a, b))
+                continue
+
+            if len(run) >= LONG_ENTRANCE:
+                chosen = [run[0], run[-1]]
+            elif run:
+                chosen = [run[len(run) // 2]]
+            else:
+                chosen = []
+            for x, y in chosen:
+                self.connect(x, y, 1)
+
+            run = []
+            if a is not None and self.maze.is_open(*a) and self.maze.is_open(*b):
+                run.append((a, b))
+
+    def local_search(self, source, cluster, targets=None, stats=None):
+        """
+        Breadth-first search from source that never leaves cluster.
+        Stops early once every cell in targets has been reached, and
+        reports expansions to stats if given. Returns (distances, parents).
+        """
+        top, bottom, left, right = self.bounds(cluster)
+        distances = {source: 0}
+        parents = {source: None}
+        remaining = set(targets) - {source} if targets is not None else None
+        frontier = deque([source])
+        while frontier:
+            cell = frontier.popleft()
+            self.num_explored += 1
+            if stats is not None:
+                stats.expanded(cell, len(frontier))
+            for _, (r, c) in self.maze.neighbors(cell):
+                if (r, c) in distances or not (top <= r < bottom and left <= c < right):
+                    continue
+                distances[(r, c)] = distances[cell] + 1
+                parents[(r, c)] = cell
+                frontier.append((r, c))
+                if remaining is not None:
+                    remaining.discard((r, c))
+                    if not remaining:
+                        return distances, parents
+        return distances, parents
+
+    def search(self, start, goal):
+        """
+        Answers one query on the abstract graph and refines it.
+        Returns (solution, explored, num_explored).
+        """
+        self.num_explored = 0
+
+        # Temporarily link start and goal into the abstract graph
+        extra = dict()
+        for cell in [start, goal]:
+            cluster = self.cluster(cell)
+            distances, _ = self.local_search(cell, cluster, stats=self.maze.stats)
+            for entrance in self.members.get(cluster, set()):
+                if entrance in distances:
+                    extra.setdefault(cell, dict())[entrance] = distances[entrance]
+                    extra.setdefault(entrance, dict())[cell] = distances[entrance]
+            if cell == start and goal in distances:
+                extra.setdefault(start, dict())[goal] = distances[goal]
+
+        # A* over entrances
+        explored = set()
+        counter = itertools.count()
+        parents = {start: None}
+        costs = {start: 0}
+        frontier = [(manhattan(start, goal), next(counter), start)]
+        while frontier:
+            _, _, node = heapq.heappop(frontier)
+            if node in explored:
+                continue
+            self.num_explored += 1
+            explored.add(node)
+            if self.maze.stats is not None:
+                self.maze.stats.expanded(node, len(frontier))
+            if node == goal:
+                break
+            links = dict(self.edges.get(node, dict()))
+            links.update(extra.get(node, dict()))
+            for other, cost in links.items():
+                cost += costs[node]
+                if other not in explored and cost < costs.get(other, float("inf")):
+                    costs[other] = cost
+                    parents[other] = node
+                    heapq.heappush(frontier, (
+                        cost + manhattan(other, goal), next(counter), other
+                    ))
+        else:
+            return None, explored, self.num_explored
+
+        # Refine each abstract edge into single steps
+        nodes = []
+        node = goal
+        while node is not None:
+            nodes.append(node)
+            node = parents[node]
+        nodes.reverse()
+
+        cells = [start]
+        for a, b in zip(nodes, nodes[1:]):
+            if manhattan(a, b) == 1 and self.cluster(a) != self.cluster(b):
+                cells.append(b)
+                continue
+            _, local = self.local_search(a, self.cluster(a), {b}, self.maze.stats)
+            segment = []
+            cell = b
+            while cell != a:
+                segment.append(cell)
+                cell = local[cell]
+            cells.extend(reversed(segment))
+
+        actions = [direction(a, b) for a, b in zip(cells, cells[1:])]
+        return (actions, cells[1:]), explored, self.num_explored
+
+    def save(self, filename):
+        """Writes the abstract graph to filename as JSON."""
+        edges = [[a[0], a[1], b[0], b[1], cost]
+                 for a in self.edges for b, cost in self.edges[a].items()
+                 if a < b]
+        with open(filename, "w") as f:
+            json.dump({
+                "height": self.maze.height,
+                "width": self.maze.width,
+                "cluster_size": self.cluster_size,
+                "edges": edges,
+            }, f)
+
+    @classmethod
+    def load(cls, filename, maze):
+        """Reads a graph written by save() for the same maze."""
+        with open(filename) as f:
+            data = json.load(f)
+        if (data["height"], data["width"]) != (maze.height, maze.width):
+            raise Exception("cluster graph was built for a different maze")
+
+        graph = cls(maze, data["cluster_size"], build=False)
+        for r, c, r2, c2, cost in data["edges"]:
+            graph.connect((r, c), (r2, c2), cost)
+        return graph
+
+
+def main():
+    if len(sys.argv) not in [3, 4]:
+        sys.exit("Usage: python hpa.py maze.txt graph.json [cluster size]")
+    size = int(sys.argv[3]) if len(sys.argv) == 4 else 16
+
+    m = Maze(sys.argv[1])
+    if os.path.exists(sys.argv[2]):
+        m.clusters = ClusterGraph.load(sys.argv[2], m)
+        print("Loaded cluster graph")
+    else:
+        m.clusters = ClusterGraph(m, size)
+        m.clusters.save(sys.argv[2])
+        print("Built cluster graph")
+    print("Entrances:", len(m.clusters.edges))
+
+    m.solve("hpa")
+    print("States Explored:", m.num_explored)
+    print("Solution length:", len(m.solution[0]))
+
+
+if __name__ == "__main__":
+    main()
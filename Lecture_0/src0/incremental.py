@@ -0,0 +1,174 @@
+"""
+Incremental re-planning for mazes whose walls change between queries.
+
+LifelongPlanner implements Lifelong Planning A* (Koenig, Likhachev and
+Furcy): it keeps g-values and one-step lookahead rhs-values for every cell
+it has touched, and after a batch of wall edits only re-expands the cells
+whose values those edits made inconsistent.
+
+Run as a script to compare repeated solve() calls against re-planning:
+
+    python incremental.py maze.txt [rounds] [edits per round]
+"""
+
+import heapq
+import random
+import sys
+import time
+
+from maze import Maze, direction, manhattan
+
+INFINITY = float("inf")
+
+
+class LifelongPlanner():
+
+    def __init__(self, maze, start, goal):
+        self.maze = maze
+        self.start = start
+        self.goal = goal
+        self.g = dict()
+        self.rhs = {start: 0}
+        self.open = dict()
+        self.heap = []
+        self.changed = set()
+        self.push(start)
+
+    def key(self, cell):
+        value = min(self.g.get(cell, INFINITY), self.rhs.get(cell, INFINITY))
+        return (value + manhattan(cell, self.goal), value)
+
+    def push(self, cell):
+        key = self.key(cell)
+        self.open[cell] = key
+        heapq.heappush(self.heap, (key, cell))
+
+    def top_key(self):
+        """Returns the smallest key in the open list, dropping stale entries."""
+        while self.heap:
+            key, cell = self.heap[0]
+            if self.open.get(cell) == key:
+                return key
+            heapq.heappop(self.heap)
+        return (INFINITY, INFINITY)
+
+    def update(self, cell):
+        """Recomputes rhs for cell and puts it on the open list if inconsistent."""
+        if cell != self.start:
+            i, j = cell
+            rhs = INFINITY
+            if self.maze.is_open(i, j):
+                for _, neighbor in self.maze.neighbors(cell):
+                    rhs = min(rhs, self.g.get(neighbor, INFINITY) + 1)
+            if rhs == INFINITY:
+                self.rhs.pop(cell, None)
+            else:
+                self.rhs[cell] = rhs
+
+        self.open.pop(cell, None)
+        if self.g.get(cell, INFINITY) != self.rhs.get(cell, INFINITY):
+            self.push(cell)
+
+    def wall_changed(self, cell):
+        """Records an edit; it is applied on the next call to solve()."""
+        self.changed.add(cell)
+
+    def solve(self):
+        """
+        Repairs the search tree after any recorded wall edits.
+        Returns (solution, explored, num_explored) for this repair only.
+        """
+        row, col = self.maze.height, self.maze.width
+        for i, j in self.changed:
+            for cell in [(i, j), (i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1)]:
+                if 0 <= cell[0] < row and 0 <= cell[1] < col:
+                    self.update(cell)
+        self.changed.clear()
+
+        num_explored = 0
+        explored = set()
+        goal = self.goal
+        while (self.top_key() < self.key(goal)
+               or self.rhs.get(goal, INFINITY) != self.g.get(goal, INFINITY)):
+            if not self.heap:
+                break
+            _, cell = heapq.heappop(self.heap)
+            del self.open[cell]
+            num_explored += 1
+            explored.add(cell)
+            if self.maze.stats is not None:
+                self.maze.stats.expanded(cell, len(self.heap))
+
+            if self.g.get(cell, INFINITY) > self.rhs.get(cell, INFINITY):
+                self.g[cell] = self.rhs[cell]
+            else:
+                self.g.pop(cell, None)
+                self.update(cell)
+            for _, neighbor in self.maze.neighbors(cell):
+                self.update(neighbor)
+
+        if self.g.get(goal, INFINITY) == INFINITY:
+            return None, explored, num_explored
+        return self.path(), explored, num_explored
+
+    def path(self):
+        """Walks back from the goal along decreasing g-values."""
+        cells = [self.goal]
+        cell = self.goal
+        while cell != self.start:
+            cell = min(
+                (neighbor for _, neighbor in self.maze.neighbors(cell)),
+                key=lambda neighbor: self.g.get(neighbor, INFINITY)
+            )
+            cells.append(cell)
+        cells.reverse()
+        actions = [direction(a, b) for a, b in zip(cells, cells[1:])]
+        return (actions, cells[1:])
+
+
+def main():
+    if len(sys.argv) not in [2, 3, 4]:
+        sys.exit("Usage: python incremental.py maze.txt [rounds] [edits]")
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    edits = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    # Both mazes see the same sequence of random wall toggles
+    rng = random.Random(0)
+    repeated = Maze(sys.argv[1])
+    incremental = Maze(sys.argv[1])
+    cells = [
+        (i, j) for i in range(repeated.height) for j in range(repeated.width)
+        if (i, j) not in [repeated.start, repeated.goal]
+    ]
+
+    totals = {"solve": [0, 0.0], "incremental": [0, 0.0]}
+    for _ in range(rounds):
+        for cell in rng.sample(cells, edits):
+            wall = not repeated.walls[cell[0]][cell[1]]
+            repeated.set_wall(cell, wall)
+            incremental.set_wall(cell, wall)
+
+        for name, m, mode in [("solve", repeated, "astar"),
+                              ("incremental", incremental, "incremental")]:
+            start = time.perf_counter()
+            try:
+                m.solve(mode)
+            except Exception:
+                m.solution = None
+            totals[name][0] += m.num_explored
+            totals[name][1] += time.perf_counter() - start
+
+        if (repeated.solution is None) != (incremental.solution is None) or (
+            repeated.solution is not None
+            and len(repeated.solution[0]) != len(incremental.solution[0])
+        ):
+            sys.exit("incremental planner disagrees with solve()")
+
+    print(f"{rounds} rounds of {edits} wall edits")
+    for name, (explored, seconds) in totals.items():
+        print(f"  {name}: {explored} states explored, {seconds:.4f}s")
+    print(f"Speedup: {totals['solve'][1] / totals['incremental'][1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Search instrumentation for Maze solvers.
+
+Attach a SearchStats to a maze and every later solve() call is measured
+without changing the calling code:
+
+    m.stats = SearchStats(trace=True, track_memory=True)
+    m.solve("astar")
+    m.stats.to_json("stats.json")
+    m.stats.trace_to_csv("trace.csv")
+
+Frontier-based modes (bfs, dfs, astar, greedy) also report contains_state
+cost; every mode, including CompactMaze's, reports time, expansions,
+frontier size and neighbors() calls. Solvers that scan neighbors inline
+count those scans as calls but add no neighbors_seconds.
+"""
+
+import csv
+import json
+import time
+import tracemalloc
+
+FIELDS = [
+    "mode", "solved", "seconds", "num_explored", "expansions_per_second",
+    "peak_frontier", "neighbors_calls", "neighbors_seconds",
+    "contains_state_calls", "contains_state_seconds", "peak_memory",
+    "solution_length",
+]
+
+
+class InstrumentedFrontier():
+    """Wraps a frontier, timing membership tests and recording each removal."""
+
+    def __init__(self, frontier, stats):
+        self.frontier = frontier
+        self.stats = stats
+
+    def add(self, node):
+        self.frontier.add(node)
+        record = self.stats.record
+        record["peak_frontier"] = max(record["peak_frontier"] or 0, len(self.frontier))
+
+    def contains_state(self, state):
+        start = time.perf_counter()
+        result = self.frontier.contains_state(state)
+        self.stats.record["contains_state_seconds"] += time.perf_counter() - start
+        self.stats.record["contains_state_calls"] += 1
+        return result
+
+    def empty(self):
+        return self.frontier.empty()
+
+    def remove(self):
+        node = self.frontier.remove()
+        self.stats.expanded(node.state, len(self.frontier))
+        return node
+
+    def __len__(self):
+        return len(self.frontier)
+
+
+class SearchStats():
+
+    def __init__(self, trace=False, track_memory=False):
+        self.trace = trace
+        self.track_memory = track_memory
+        self.records = []
+        self.steps = []
+        self.record = None
+
+    def begin(self, maze, mode):
+        """Starts a new record and times the maze's neighbors()."""
+        self.record = dict.fromkeys(FIELDS)
+        self.record.update({
+            "mode": mode if isinstance(mode, str) else mode.__name__,
+            "neighbors_calls": 0,
+            "neighbors_seconds": 0.0,
+            "contains_state_calls": 0,
+            "contains_state_seconds": 0.0,
+        })
+        self.expansions = 0
+        self.run = len(self.records)
+
+        # Shadow the bound method with a timed one until end()
+        neighbors = maze.neighbors
+        record = self.record
+
+        def timed_neighbors(state):
+            start = time.perf_counter()
+            result = neighbors(state)
+            record["neighbors_seconds"] += time.perf_counter() - start
+            record["neighbors_calls"] += 1
+            return result
+        maze.neighbors = timed_neighbors
+
+        if self.track_memory:
+            tracemalloc.start()
+        self.started = time.perf_counter()
+
+    def end(self, maze, solution):
+        """
+        Closes the current record with the results of the solve. Also runs
+        when the solver raised, so it must not raise itself.
+        """
+        seconds = time.perf_counter() - self.started
+        del maze.neighbors
+
+        record = self.record
+        if self.track_memory:
+            record["peak_memory"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        # A maze whose first solve raised has no num_explored yet
+        explored = getattr(maze, "num_explored", None)
+        record["solved"] = solution is not None
+        record["seconds"] = seconds
+        record["num_explored"] = explored
+        record["expansions_per_second"] = (
+            explored / seconds if explored is not None and seconds else None
+        )
+        record["solution_length"] = len(solution[0]) if solution is not None else None
+        self.records.append(record)
+        self.record = None
+
+    def watch(self, frontier):
+        """Returns frontier wrapped so its use is recorded."""
+        return InstrumentedFrontier(frontier, self)
+
+    def expanded(self, state, frontier_size=None, neighbors=False):
+        """
+        Records the removal of state from the frontier. Solvers that do not
+        use a watched frontier report here directly, passing neighbors=True
+        when they look at the state's neighbors without calling neighbors().
+        """
+        record = self.record
+        if record is None:
+            return
+        self.expansions += 1
+        if frontier_size is not None:
+            record["peak_frontier"] = max(record["peak_frontier"] or 0, frontier_size)
+        if neighbors:
+            record["neighbors_calls"] += 1
+        if self.trace:
+            self.steps.append((
+                self.run, self.expansions, state[0], state[1], frontier_size,
+                time.perf_counter() - self.started,
+            ))
+
+    def to_json(self, filename):
+        with open(filename, "w") as f:
+            json.dump(self.records, f, indent=4)
+
+    def to_csv(self, filename):
+        with open(filename, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(self.records)
+
+    def trace_to_csv(self, filename):
+        """Writes one row per expansion across all recorded solves."""
+        with open(filename, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["run", "step", "row", "col", "frontier", "seconds"])
+            writer.writerows(self.steps)
+
+    def save(self, filename):
+        """Writes the records as CSV or JSON, depending on the extension."""
+        if filename.endswith(".csv"):
+            self.to_csv(filename)
+        else:
+            self.to_json(filename)
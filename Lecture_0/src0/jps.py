@@ -0,0 +1,103 @@
+"""
+Jump Point Search for 4-connected, uniform-cost mazes.
+
+Instead of pushing every neighbor, each expansion slides in a straight line
+until it reaches the goal or a jump point, and only jump points enter the
+frontier. Shortest paths are made canonical by allowing vertical moves to
+turn anywhere, while horizontal moves may only turn where a vertical
+neighbor opens up that was blocked one cell earlier (a forced neighbor).
+"""
+
+import heapq
+import itertools
+
+from maze import direction, manhattan
+
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+
+def jump(maze, cell, dr, dc, goal):
+    """
+    Slides from cell in direction (dr, dc) and returns the first jump point
+    reached, or None if the slide runs into a wall.
+    """
+    r, c = cell
+    while True:
+        pr, pc = r, c
+        r, c = r + dr, c + dc
+        if not maze.is_open(r, c):
+            return None
+        if (r, c) == goal:
+            return (r, c)
+
+        if dr == 0:
+            # Horizontal: stop where a vertical neighbor opens up
+            for v in [-1, 1]:
+                if maze.is_open(r + v, c) and not maze.is_open(pr + v, pc):
+                    return (r, c)
+        else:
+            # Vertical: stop where a horizontal slide would find something
+            if (jump(maze, (r, c), 0, -1, goal) is not None
+                    or jump(maze, (r, c), 0, 1, goal) is not None):
+                return (r, c)
+
+
+def jump_point_search(maze, start, goal):
+    """
+    A* over jump points. Returns (solution, explored, num_explored), where
+    explored holds the jump points that were expanded.
+    """
+    num_explored = 0
+    explored = set()
+    counter = itertools.count()
+    parents = {start: None}
+    costs = {start: 0}
+    frontier = [(manhattan(start, goal), next(counter), start)]
+
+    while frontier:
+        _, _, cell = heapq.heappop(frontier)
+        if cell in explored:
+            continue
+        num_explored += 1
+        if maze.stats is not None:
+            maze.stats.expanded(cell, len(frontier), neighbors=True)
+
+        if cell == goal:
+            return unroll(parents, goal), explored, num_explored
+        explored.add(cell)
+
+        for dr, dc in DIRECTIONS:
+            point = jump(maze, cell, dr, dc, goal)
+            if point is None or point in explored:
+                continue
+            cost = costs[cell] + manhattan(cell, point)
+            if cost < costs.get(point, float("inf")):
+                costs[point] = cost
+                parents[point] = cell
+                heapq.heappush(frontier, (
+                    cost + manhattan(point, goal), next(counter), point
+                ))
+
+    return None, explored, num_explored
+
+
+def unroll(parents, goal):
+    """Expands the chain of jump points ending at goal into single steps."""
+    points = []
+    point = goal
+    while point is not None:
+        points.append(point)
+        point = parents[point]
+    points.reverse()
+
+    actions = []
+    cells = []
+    for (r, c), (r2, c2) in zip(points, points[1:]):
+        dr = (r2 > r) - (r2 < r)
+        dc = (c2 > c) - (c2 < c)
+        while (r, c) != (r2, c2):
+            step = (r + dr, c + dc)
+            actions.append(direction((r, c), step))
+            cells.append(step)
+            r, c = step
+    return (actions, cells)
@@ -1,11 +1,17 @@
+import heapq
+import itertools
+import os
 import sys
 import PIL
 
+from collections import deque
+
 class Node():
-    def __init__(self, state, parent, action):
+    def __init__(self, state, parent, action, cost=0):
         self.state = state
         self.parent = parent
         self.action = action
+        self.cost = cost
 
 
 class StackFrontier():
@@ -40,6 +46,301 @@ class QueueFrontier(StackFrontier):
             self.frontier = self.frontier[1:]
             return node
 
+
+class IndexedStackFrontier():
+    """
+    Stack frontier that keeps a set of its states beside the stack,
+    so membership tests and removals are both O(1).
+    """
+
+    def __init__(self):
+        self.frontier = []
+        self.states = set()
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states.add(node.state)
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def __len__(self):
+        return len(self.frontier)
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.pop()
+            self.states.discard(node.state)
+            return node
+
+
+class IndexedQueueFrontier(IndexedStackFrontier):
+    """
+    Queue frontier backed by a deque, so dequeueing is O(1)
+    instead of copying the whole list.
+    """
+
+    def __init__(self):
+        self.frontier = deque()
+        self.states = set()
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.popleft()
+            self.states.discard(node.state)
+            return node
+
+
+class PriorityFrontier():
+    """
+    Heap-backed frontier that always removes the node with the lowest
+    priority. Adding a state that is already in the frontier with a better
+    priority replaces the old entry (stale heap entries are skipped lazily).
+    """
+
+    def __init__(self, priority):
+        self.priority = priority
+        self.frontier = []
+        self.best = dict()
+        self.counter = itertools.count()
+
+    def add(self, node):
+        priority = self.priority(node)
+        if node.state in self.best and self.best[node.state] <= priority:
+            return
+        self.best[node.state] = priority
+        heapq.heappush(self.frontier, (priority, next(self.counter), node))
+
+    def contains_state(self, state):
+        return state in self.best
+
+    def empty(self):
+        return len(self.best) == 0
+
+    def __len__(self):
+        return len(self.best)
+
+    def remove(self):
+        while self.frontier:
+            priority, _, node = heapq.heappop(self.frontier)
+            if self.best.get(node.state) == priority:
+                del self.best[node.state]
+                return node
+        raise Exception("empty frontier")
+
+
+def manhattan(a, b):
+    """Returns the Manhattan distance between two cells."""
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def direction(a, b):
+    """Returns the action that moves from cell a to the adjacent cell b."""
+    if b[0] < a[0]:
+        return "up"
+    if b[0] > a[0]:
+        return "down"
+    if b[1] < a[1]:
+        return "left"
+    return "right"
+
+
+def backtrack(node):
+    """Returns the (actions, cells) path that leads to node."""
+    actions = []
+    cells = []
+    while node.parent is not None:
+        actions.append(node.action)
+        cells.append(node.state)
+        node = node.parent
+    actions.reverse()
+    cells.reverse()
+    return (actions, cells)
+
+
+def uninformed_search(maze, start, goal, frontier):
+    """
+    Searches from start to goal, expanding nodes in the order the frontier
+    hands them out. Returns (solution, explored, num_explored), where
+    solution is None if there is no path.
+    """
+    num_explored = 0
+    explored = set()
+    if maze.stats is not None:
+        frontier = maze.stats.watch(frontier)
+    frontier.add(Node(state=start, parent=None, action=None))
+
+    while not frontier.empty():
+        node = frontier.remove()
+        num_explored += 1
+
+        if node.state == goal:
+            return backtrack(node), explored, num_explored
+
+        explored.add(node.state)
+
+        for action, state in maze.neighbors(node.state):
+            if not frontier.contains_state(state) and state not in explored:
+                child = Node(state=state, parent=node, action=action)
+                frontier.add(child)
+
+    return None, explored, num_explored
+
+
+def informed_search(maze, start, goal, priority):
+    """
+    Best-first search ordered by priority(node), with duplicate states in
+    the frontier replaced when a cheaper path to them is found.
+    """
+    num_explored = 0
+    explored = set()
+    frontier = PriorityFrontier(priority)
+    if maze.stats is not None:
+        frontier = maze.stats.watch(frontier)
+    frontier.add(Node(state=start, parent=None, action=None))
+
+    while not frontier.empty():
+        node = frontier.remove()
+        num_explored += 1
+
+        if node.state == goal:
+            return backtrack(node), explored, num_explored
+
+        explored.add(node.state)
+
+        for action, state in maze.neighbors(node.state):
+            if state not in explored:
+                child = Node(state=state, parent=node, action=action,
+                             cost=node.cost + 1)
+                frontier.add(child)
+
+    return None, explored, num_explored
+
+
+def breadth_first(maze, start, goal):
+    return uninformed_search(maze, start, goal, IndexedQueueFrontier())
+
+
+def depth_first(maze, start, goal):
+    return uninformed_search(maze, start, goal, IndexedStackFrontier())
+
+
+def a_star(maze, start, goal):
+    # Break ties in f towards nodes closer to the goal
+    return informed_search(maze, start, goal, lambda node: (
+        node.cost + manhattan(node.state, goal), manhattan(node.state, goal)
+    ))
+
+
+def greedy_best_first(maze, start, goal):
+    return informed_search(
+        maze, start, goal, lambda node: manhattan(node.state, goal)
+    )
+
+
+def bidirectional(maze, start, goal):
+    """
+    Breadth-first search from both ends at once, always growing the smaller
+    side by one full layer, until the two searches meet.
+    """
+    if start == goal:
+        return ([], []), set(), 1
+
+    parents = [{start: None}, {goal: None}]
+    layers = [[start], [goal]]
+    explored = set()
+    num_explored = 0
+
+    while layers[0] and layers[1]:
+        side = 0 if len(layers[0]) <= len(layers[1]) else 1
+        seen, other = parents[side], parents[1 - side]
+        meeting = None
+        next_layer = []
+        for cell in layers[side]:
+            num_explored += 1
+            explored.add(cell)
+            if maze.stats is not None:
+                maze.stats.expanded(cell, len(layers[0]) + len(layers[1]) + len(next_layer))
+            for _, state in maze.neighbors(cell):
+                if state in seen:
+                    continue
+                seen[state] = cell
+                next_layer.append(state)
+                if state in other and meeting is None:
+                    meeting = state
+        if meeting is not None:
+            break
+        layers[side] = next_layer
+    else:
+        return None, explored, num_explored
+
+    # Walk back to the start, then forward to the goal
+    cells = []
+    cell = meeting
+    while cell is not None:
+        cells.append(cell)
+        cell = parents[0][cell]
+    cells.reverse()
+    cell = parents[1][meeting]
+    while cell is not None:
+        cells.append(cell)
+        cell = parents[1][cell]
+    actions = [direction(a, b) for a, b in zip(cells, cells[1:])]
+    return (actions, cells[1:]), explored, num_explored
+
+
+def incremental(maze, start, goal):
+    """
+    Lifelong Planning A*: the search tree is kept on the maze between calls
+    and only the parts affected by set_wall edits since the last call are
+    re-expanded.
+    """
+    from incremental import LifelongPlanner
+
+    planner = maze.planner
+    if planner is None or (planner.start, planner.goal) != (start, goal):
+        planner = maze.planner = LifelongPlanner(maze, start, goal)
+    return planner.solve()
+
+
+def jump_point(maze, start, goal):
+    """Jump Point Search; see jps.py."""
+    from jps import jump_point_search
+
+    return jump_point_search(maze, start, goal)
+
+
+def hierarchical(maze, start, goal):
+    """
+    HPA* over the maze's cluster graph (see hpa.py), building it on first
+    use. Set maze.clusters to a graph loaded from disk to skip the build.
+    """
+    from hpa import ClusterGraph
+
+    if maze.clusters is None:
+        maze.clusters = ClusterGraph(maze)
+    return maze.clusters.search(start, goal)
+
+
+SOLVERS = {
+    "bfs": breadth_first,
+    "dfs": depth_first,
+    "astar": a_star,
+    "greedy": greedy_best_first,
+    "bidirectional": bidirectional,
+    "incremental": incremental,
+    "jps": jump_point,
+    "hpa": hierarchical,
+}
+
+
 class Maze():
 
     def __init__(self, filename):
@@ -80,6 +381,13 @@ class Maze():
             self.walls.append(row)
 
         self.solution = None
+        self.distances = None
+        self.toward = None
+        self.planner = None
+        self.clusters = None
+        self.components = None
+        self.indexed = False
+        self.stats = None
 
 
     def print(self):
@@ -101,6 +409,11 @@ class Maze():
         print()
 
 
+    def is_open(self, row, col):
+        """Returns True if (row, col) is inside the maze and not a wall."""
+        return 0 <= row < self.height and 0 <= col < self.width and not self.walls[row][col]
+
+
     def neighbors(self, state):
         row, col = state
         candidates = [
@@ -117,55 +430,172 @@ class Maze():
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
-
-        # Keep track of number of states explored
-        self.num_explored = 0
-
-        # Initialize frontier to just the starting position
-        start = Node(state=self.start, parent=None, action=None)
-        frontier = QueueFrontier()
-        frontier.add(start)
-
-        # Initialize an empty explored set
-        self.explored = set()
-
-        # Keep looping until solution found
-        while True:
-
-            # If nothing left in frontier, then no path
-            if frontier.empty():
-                raise Exception("no solution")
-
-            # Choose a node from the frontier
-            node = frontier.remove()
-            self.num_explored += 1
-
-            # If node is the goal, then we have a solution
-            if node.state == self.goal:
-                actions = []
-                cells = []
-                while node.parent is not None:
-                    actions.append(node.action)
-                    cells.append(node.state)
-                    node = node.parent
-                actions.reverse()
-                cells.reverse()
-                self.solution = (actions, cells)
-                return
+    def solve(self, mode="bfs"):
+        """
+        Finds a solution to maze, if one exists.
+
+        `mode` names one of the strategies in SOLVERS, or is itself a
+        function solver(maze, start, goal) returning
+        (solution, explored, num_explored).
+
+        If self.stats holds a SearchStats, the solve is recorded in it.
+        """
+        solver = SOLVERS[mode] if isinstance(mode, str) else mode
+
+        # Measure this solve if a SearchStats is attached (see instrument.py)
+        solution = None
+        if self.stats is not None:
+            self.stats.begin(self, mode)
+        try:
+            if self.unreachable(self.start, self.goal):
+                solution, self.explored, self.num_explored = None, set(), 0
+            else:
+                solution, self.explored, self.num_explored = solver(
+                    self, self.start, self.goal
+                )
+        finally:
+            if self.stats is not None:
+                self.stats.end(self, solution)
+
+        # If nothing left in frontier, then no path
+        if solution is None:
+            raise Exception("no solution")
+        self.solution = solution
+
+
+    def solve_pairs(self, pairs, mode="bfs"):
+        """
+        Solves each (start, goal) pair with the given mode, returning a list
+        of solutions with None for pairs that have no path. Pairs in
+        different regions are skipped using the connectivity index.
+        """
+        solver = SOLVERS[mode] if isinstance(mode, str) else mode
+        index = self.connectivity()
+        solutions = []
+        for start, goal in pairs:
+            if index.connected(start, goal):
+                solutions.append(solver(self, start, goal)[0])
+            else:
+                solutions.append(None)
+        return solutions
+
+
+    def connectivity(self):
+        """
+        Returns the maze's connectivity index, building it if needed.
+        The first call opts the maze in: from then on solve() rejects
+        disconnected start and goal through the index, rebuilding it
+        whenever an added wall has dropped it.
+        """
+        from components import ConnectivityIndex
+
+        self.indexed = True
+        if self.components is None:
+            self.components = ConnectivityIndex(self)
+        return self.components
+
+
+    def unreachable(self, start, goal):
+        """
+        Returns True if the connectivity index shows that no path joins
+        start and goal. Always False until connectivity() has been called,
+        so mazes that never ask for the index never pay to build it.
+        """
+        return self.indexed and not self.connectivity().connected(start, goal)
+
+
+    def set_wall(self, cell, wall=True):
+        """Adds or removes the wall at cell."""
+        i, j = cell
+        self.walls[i][j] = wall
+        self.invalidate(cell)
+
+
+    def invalidate(self, cell):
+        """Drops anything cached about the maze after the wall at cell changed."""
+        self.distances = None
+        self.toward = None
+        self.clusters = None
+        if self.planner is not None:
+            self.planner.wall_changed(cell)
+
+        # Removing a wall only merges regions; adding one may split them
+        if self.components is not None:
+            if self.is_open(*cell):
+                self.components.opened(cell)
+            else:
+                self.components = None
+
+
+    def distance_field(self):
+        """
+        Runs one breadth-first search outward from the goal and caches, for
+        every cell that can reach it, the distance to the goal and the next
+        cell on a shortest path there. Does nothing if already cached.
+        """
+        if self.toward is not None:
+            return
+
+        self.distances = {self.goal: 0}
+        self.toward = {self.goal: None}
+        frontier = deque([self.goal])
+        while frontier:
+            cell = frontier.popleft()
+            for _, state in self.neighbors(cell):
+                if state not in self.toward:
+                    self.distances[state] = self.distances[cell] + 1
+                    self.toward[state] = cell
+                    frontier.append(state)
+
+
+    def distance_from(self, cell):
+        """Returns the length of a shortest path from cell to the goal, or None."""
+        self.distance_field()
+        return self.distances.get(cell)
+
+
+    def path_from(self, cell):
+        """
+        Returns a shortest path (actions, cells) from cell to the goal, in
+        the same format as self.solution, following the cached field.
+        """
+        self.distance_field()
+        if cell not in self.toward:
+            raise Exception("no solution")
+
+        actions = []
+        cells = []
+        while cell != self.goal:
+            step = self.toward[cell]
+            actions.append(direction(cell, step))
+            cells.append(step)
+            cell = step
+        return (actions, cells)
+
+
+    def distances_from(self, cells):
+        """Returns distance_from for each cell, None where unreachable."""
+        return [self.distance_from(cell) for cell in cells]
+
+
+    def paths_from(self, cells):
+        """Returns path_from for each cell, None where unreachable."""
+        self.distance_field()
+        return [self.path_from(cell) if cell in self.toward else None
+                for cell in cells]
 
-            # Mark node as explored
-            self.explored.add(node.state)
 
-            # Add neighbors to frontier
-            for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
-                    child = Node(state=state, parent=node, action=action)
-                    frontier.add(child)
+    def output_image(self, filename, show_solution=True, show_explored=False):
 
+        # Render with NumPy when available; see render.py
+        try:
+            import render
+        except ImportError:
+            render = None
+        if render is not None:
+            render.output_image(self, filename, show_solution, show_explored)
+            return
 
-    def output_image(self, filename, show_solution=True, show_explored=False):
         from PIL import Image, ImageDraw
         cell_size = 50
         cell_border = 2
@@ -216,15 +646,35 @@ class Maze():
         img.save(filename)
 
 
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit(f"Usage: python maze.py maze.txt [{'|'.join(SOLVERS)}]")
+    mode = sys.argv[2] if len(sys.argv) == 3 else "bfs"
+
+    m = Maze(sys.argv[1])
+
+    # MAZE_STATS=stats.json (or .csv) records the solve; MAZE_TRACE=trace.csv
+    # also records every expansion
+    if os.environ.get("MAZE_STATS") or os.environ.get("MAZE_TRACE"):
+        from instrument import SearchStats
+        m.stats = SearchStats(trace=bool(os.environ.get("MAZE_TRACE")),
+                              track_memory=True)
+
+    print("Maze:")
+    m.print()
+    print("Solving...")
+    m.solve(mode)
+    print("States Explored:", m.num_explored)
+    print("Solution:")
+    m.print()
+    m.output_image("maze.png", show_explored=True)
+
+    if m.stats is not None:
+        if os.environ.get("MAZE_STATS"):
+            m.stats.save(os.environ["MAZE_STATS"])
+        if os.environ.get("MAZE_TRACE"):
+            m.stats.trace_to_csv(os.environ["MAZE_TRACE"])
+
 
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze.png", show_explored=True)
+if __name__ == "__main__":
+    main()
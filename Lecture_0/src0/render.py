@@ -0,0 +1,142 @@
+"""
+Vectorized maze rendering.
+
+Each cell gets a palette index from the wall, explored and solution masks,
+the index grid is blown up to pixels with np.repeat, and PIL receives the
+finished RGBA array in one call. output_tiles renders a large maze as a
+grid of separate images of bounded pixel size, so only one tile's pixels
+are ever held in memory.
+"""
+
+import numpy as np
+
+from PIL import Image
+
+BACKGROUND, WALL, START, GOAL, SOLUTION, EXPLORED, EMPTY = range(7)
+PALETTE = np.array([
+    (0, 0, 0, 255),
+    (40, 40, 40, 255),
+    (255, 0, 0, 255),
+    (0, 171, 28, 255),
+    (220, 235, 113, 255),
+    (212, 97, 85, 255),
+    (237, 240, 252, 255),
+], dtype=np.uint8)
+
+CELL_SIZE = 50
+CELL_BORDER = 2
+
+# Width and height of one output_tiles() image, in pixels
+TILE_SIZE = 4096
+
+
+def wall_mask(maze, top, bottom, left, right):
+    """Returns the walls in rows top:bottom and columns left:right."""
+    walls = maze.walls
+    if hasattr(walls, "bits"):
+        rows = np.unpackbits(walls.bits[top:bottom], axis=1, count=walls.width)
+        return rows[:, left:right].astype(bool)
+    return np.array([row[left:right] for row in walls[top:bottom]], dtype=bool)
+
+
+def full_mask(maze, cells):
+    """
+    Returns cells as a mask that region() can cut from: a CellMask as it
+    is, anything else as one boolean array over the whole maze.
+    """
+    if hasattr(cells, "mask"):
+        return cells
+    mask = np.zeros((maze.height, maze.width), dtype=bool)
+    if cells:
+        rows, cols = np.array(list(cells)).T
+        mask[rows, cols] = True
+    return mask
+
+
+def region(mask, top, bottom, left, right):
+    """Returns the part of a full_mask() in rows top:bottom and columns left:right."""
+    if hasattr(mask, "mask"):
+        return mask.mask(top, bottom, left, right)
+    return mask[top:bottom, left:right]
+
+
+def overlays(maze, show_solution=True, show_explored=False):
+    """
+    Returns the (explored, solution) masks to paint, with None for a layer
+    that is hidden. Build them once and pass them to every render() call.
+    """
+    if maze.solution is None:
+        return None, None
+    explored = full_mask(maze, maze.explored) if show_explored else None
+    solution = full_mask(maze, maze.solution[1]) if show_solution else None
+    return explored, solution
+
+
+def cell_colors(maze, top, bottom, left, right, explored=None, solution=None):
+    """Returns the palette index of every cell in the region."""
+    colors = np.full((bottom - top, right - left), EMPTY, dtype=np.uint8)
+
+    # Paint from lowest to highest precedence
+    if explored is not None:
+        colors[region(explored, top, bottom, left, right)] = EXPLORED
+    if solution is not None:
+        colors[region(solution, top, bottom, left, right)] = SOLUTION
+    for cell, color in [(maze.goal, GOAL), (maze.start, START)]:
+        if top <= cell[0] < bottom and left <= cell[1] < right:
+            colors[cell[0] - top, cell[1] - left] = color
+    colors[wall_mask(maze, top, bottom, left, right)] = WALL
+    return colors
+
+
+def render(maze, top=0, bottom=None, left=0, right=None,
+           show_solution=True, show_explored=False,
+           cell_size=CELL_SIZE, cell_border=CELL_BORDER, layers=None):
+    """
+    Returns the region as an RGBA pixel array. layers is the result of
+    overlays(); by default it is built for this call.
+    """
+    bottom = maze.height if bottom is None else bottom
+    right = maze.width if right is None else right
+    if layers is None:
+        layers = overlays(maze, show_solution, show_explored)
+    colors = cell_colors(maze, top, bottom, left, right, *layers)
+
+    pixels = np.repeat(np.repeat(colors, cell_size, axis=0), cell_size, axis=1)
+
+    # Leave a border of background around each cell
+    offset = np.arange(cell_size)
+    inside = (cell_border <= offset) & (offset <= cell_size - cell_border)
+    pixels[~np.tile(inside, bottom - top), :] = BACKGROUND
+    pixels[:, ~np.tile(inside, right - left)] = BACKGROUND
+    return PALETTE[pixels]
+
+
+def output_image(maze, filename, show_solution=True, show_explored=False,
+                 cell_size=CELL_SIZE, cell_border=CELL_BORDER):
+    """Renders the whole maze into a single image file."""
+    pixels = render(maze, show_solution=show_solution, show_explored=show_explored,
+                    cell_size=cell_size, cell_border=cell_border)
+    Image.fromarray(pixels).save(filename)
+
+
+def output_tiles(maze, pattern, tile=TILE_SIZE, show_solution=True,
+                 show_explored=False, cell_size=CELL_SIZE, cell_border=CELL_BORDER):
+    """
+    Renders the maze as tiles of at most tile x tile pixels, saving each one
+    to pattern.format(row=..., col=...), e.g. "tiles/maze_{row}_{col}.png".
+    Returns the list of filenames written.
+    """
+    cells = max(1, tile // cell_size)
+    layers = overlays(maze, show_solution, show_explored)
+    filenames = []
+    for row, top in enumerate(range(0, maze.height, cells)):
+        for col, left in enumerate(range(0, maze.width, cells)):
+            pixels = render(
+                maze, top, min(top + cells, maze.height),
+                left, min(left + cells, maze.width),
+                cell_size=cell_size, cell_border=cell_border, layers=layers
+            )
+            filename = pattern.format(row=row, col=col)
+            Image.fromarray(pixels).save(filename)
+            filenames.append(filename)
+    return filenames
@@ -0,0 +1,218 @@
+"""
+Monte Carlo Tree Search (UCT) for tic-tac-toe and other m,n,k-games.
+
+The engine only uses player, actions, result, terminal and utility, taken
+from tictactoe.py by default or from any object that provides them, such
+as mnk.Game(5, 5, 4). Random playouts run on a process pool:
+
+    with MCTS(mnk.Game(5, 5, 4), playouts=20000, seconds=2) as engine:
+        move = engine.best_move(board)
+
+Each search stops after the playout budget or the wall-clock limit,
+whichever comes first. The tree is kept between calls, so when the next
+board is a position the last search already explored (after our move and
+the opponent's reply), its statistics are reused.
+"""
+
+import math
+import os
+import random
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import mnk
+import tictactoe as ttt
+
+from tictactoe import X
+
+PLAYOUTS = 10000
+SECONDS = 1.0
+
+# Playouts run from a leaf by one pool task
+CHUNK = 16
+
+EXPLORATION = math.sqrt(2)
+
+
+def rollout(game, board, count, seed):
+    """
+    Plays count random games from board and returns the sum of their
+    utilities (for X). game is None for the rules in tictactoe.py.
+    """
+    rules = game or ttt
+    rng = random.Random(seed)
+    total = 0
+    for _ in range(count):
+        state = board
+        while not rules.terminal(state):
+            state = rules.result(state, rng.choice(sorted(rules.actions(state))))
+        total += rules.utility(state)
+    return total
+
+
+class Node():
+
+    def __init__(self, rules, board, parent=None, move=None):
+        self.board = board
+        self.parent = parent
+        self.move = move
+        self.children = {}
+        self.terminal = rules.terminal(board)
+        self.untried = [] if self.terminal else sorted(rules.actions(board))
+
+        # Value is kept for the player who moved into this node
+        self.sign = 0
+        if parent is not None:
+            self.sign = 1 if rules.player(parent.board) == X else -1
+        self.visits = 0
+        self.value = 0.0
+
+
+class MCTS():
+
+    def __init__(self, game=None, playouts=PLAYOUTS, seconds=SECONDS,
+                 workers=None, chunk=CHUNK, exploration=EXPLORATION, seed=None):
+        """
+        workers is the size of the process pool (None for one per CPU),
+        or 0 to run playouts in this process.
+        """
+        self.game = game
+        self.rules = game or ttt
+        self.playouts = playouts
+        self.seconds = seconds
+        self.chunk = chunk
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.root = None
+
+        if workers == 0:
+            self.executor = None
+            self.batch = 1
+        else:
+            self.executor = ProcessPoolExecutor(max_workers=workers)
+            self.batch = workers or os.cpu_count()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def reuse(self, board):
+        """
+        Returns the node for board from the last search's tree, looking at
+        the root and two plies below it, or a new root.
+        """
+        if self.root is not None:
+            nodes = [self.root]
+            for child in self.root.children.values():
+                nodes.append(child)
+                nodes.extend(child.children.values())
+            for node in nodes:
+                if node.board == board:
+                    node.parent = None
+                    return node
+        return Node(self.rules, board)
+
+    def select(self):
+        """
+        Walks down the tree by UCT to a terminal node or a new child.
+        """
+        node = self.root
+        while not node.terminal:
+            if node.untried:
+                move = node.untried.pop(self.rng.randrange(len(node.untried)))
+                child = Node(self.rules, self.rules.result(node.board, move), node, move)
+                node.children[move] = child
+                return child
+
+            log_visits = math.log(node.visits)
+            node = max(
+                node.children.values(),
+                key=lambda child: child.value / child.visits
+                + self.exploration * math.sqrt(log_visits / child.visits)
+            )
+        return node
+
+    def best_move(self, board):
+        """
+        Returns the most visited move after searching from board. At least
+        one batch of playouts runs, however small the budget.
+        """
+        if self.rules.terminal(board):
+            return None
+
+        self.root = self.reuse(board)
+        deadline = time.perf_counter() + self.seconds
+        done = 0
+        # The first batch always runs, so the root has a move to return
+        while done == 0 or (done < self.playouts and time.perf_counter() < deadline):
+
+            # Pick a batch of leaves, counting their playouts as visits up
+            # front so later picks in the batch spread over the tree
+            leaves = []
+            for _ in range(self.batch):
+                leaf = self.select()
+                node = leaf
+                while node is not None:
+                    node.visits += self.chunk
+                    node = node.parent
+                leaves.append(leaf)
+
+            for leaf, total in zip(leaves, self.evaluate(leaves)):
+                node = leaf
+                while node is not None:
+                    node.value += node.sign * total
+                    node = node.parent
+            done += self.chunk * len(leaves)
+
+        self.searched = done
+        return max(self.root.children.values(), key=lambda child: child.visits).move
+
+    def evaluate(self, leaves):
+        """Returns the total utility of chunk playouts from each leaf."""
+        boards = [leaf.board for leaf in leaves if not leaf.terminal]
+        seeds = [self.rng.getrandbits(32) for _ in boards]
+        run = map if self.executor is None else self.executor.map
+        totals = iter(run(rollout, repeat(self.game), boards, repeat(self.chunk), seeds))
+        return [
+            self.rules.utility(leaf.board) * self.chunk if leaf.terminal else next(totals)
+            for leaf in leaves
+        ]
+
+
+def main():
+    if len(sys.argv) not in [1, 4, 6]:
+        sys.exit("Usage: python mcts.py [height width k [playouts seconds]]")
+    game = None
+    if len(sys.argv) > 1:
+        game = mnk.Game(*(int(arg) for arg in sys.argv[1:4]))
+    playouts = int(sys.argv[4]) if len(sys.argv) > 4 else PLAYOUTS
+    seconds = float(sys.argv[5]) if len(sys.argv) > 5 else SECONDS
+
+    # Self-play with one shared tree, printing the board after every move
+    rules = game or ttt
+    board = rules.initial_state()
+    with MCTS(game, playouts, seconds) as engine:
+        while not rules.terminal(board):
+            mark = rules.player(board)
+            start = time.perf_counter()
+            move = engine.best_move(board)
+            board = rules.result(board, move)
+            print(f"{mark} plays {move} after {engine.searched} playouts "
+                  f"in {time.perf_counter() - start:.2f}s")
+            for row in board:
+                print(" ".join(cell or "." for cell in row))
+            print()
+    print(f"Winner: {rules.winner(board)}")
+
+
+if __name__ == "__main__":
+    main()
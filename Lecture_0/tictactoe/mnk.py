@@ -0,0 +1,245 @@
+"""
+m,n,k-games: tic-tac-toe on any height x width board, won with k in a row
+(4x4, 5x5, or 15x15 with k = 5 for gomoku).
+
+best_move runs iterative-deepening alpha-beta under a wall-clock budget,
+scoring positions at the search horizon with a heuristic that rewards
+lines one player could still complete, so it answers within the budget on
+any board size.
+"""
+
+import functools
+import math
+import sys
+import time
+
+import tictactoe as ttt
+
+from tictactoe import X, O, EMPTY, DIRECTIONS
+
+# Seconds best_move may spend on one move
+BUDGET = 1.0
+
+# On boards with more cells than this, only empty cells within RADIUS of a
+# mark are tried as moves. Every winning or blocking cell is next to a mark,
+# but forks need not be, so smaller boards search every empty cell
+SMALL_BOARD = 16
+RADIUS = 1
+
+
+class TimeUp(Exception):
+    pass
+
+
+class Game():
+    """
+    The rules of one m,n,k-game, with the same interface as tictactoe.py so
+    other engines can play any board size.
+    """
+
+    def __init__(self, height=3, width=3, k=3):
+        self.height = height
+        self.width = width
+        self.k = k
+
+    def initial_state(self):
+        return ttt.initial_state(self.height, self.width)
+
+    def player(self, board):
+        return ttt.player(board)
+
+    def actions(self, board):
+        return ttt.actions(board)
+
+    def result(self, board, action):
+        return ttt.result(board, action)
+
+    def winner(self, board):
+        return ttt.winner(board, self.k)
+
+    def terminal(self, board):
+        return ttt.terminal(board, self.k)
+
+    def utility(self, board):
+        return ttt.utility(board, self.k)
+
+    def best_move(self, board, budget=BUDGET):
+        return best_move(board, self.k, budget)
+
+
+def makes_line(board, cell, k):
+    """Returns True if the mark on cell is part of k in a row."""
+    for di, dj in DIRECTIONS:
+        forward = ttt.line_length(board, cell, (di, dj), k)
+        backward = ttt.line_length(board, cell, (-di, -dj), k)
+        if forward + backward - 1 >= k:
+            return True
+    return False
+
+
+@functools.lru_cache(maxsize=None)
+def windows(height, width, k):
+    """Returns every run of k cells that could hold a winning line."""
+    runs = []
+    for i in range(height):
+        for j in range(width):
+            for di, dj in DIRECTIONS:
+                end_i, end_j = i + (k - 1) * di, j + (k - 1) * dj
+                if 0 <= end_i < height and 0 <= end_j < width:
+                    runs.append(tuple((i + s * di, j + s * dj) for s in range(k)))
+    return runs
+
+
+def evaluate(board, k):
+    """
+    Scores a non-terminal board for X: every window that only one player
+    has marks in is worth 10 ** (number of their marks) to that player.
+    """
+    score = 0
+    for window in windows(len(board), len(board[0]), k):
+        xs = os = 0
+        for i, j in window:
+            cell = board[i][j]
+            if cell == X:
+                xs += 1
+            elif cell == O:
+                os += 1
+        if xs and not os:
+            score += 10 ** xs
+        elif os and not xs:
+            score -= 10 ** os
+    return score
+
+
+def candidate_moves(board):
+    """
+    Returns the empty cells to try: all of them on a small board, otherwise
+    those next to a mark, or the center of an empty board.
+    """
+    height, width = len(board), len(board[0])
+    moves = []
+    for i in range(height):
+        for j in range(width):
+            if board[i][j] != EMPTY:
+                continue
+            if height * width <= SMALL_BOARD or any(
+                board[r][c] != EMPTY
+                for r in range(max(0, i - RADIUS), min(height, i + RADIUS + 1))
+                for c in range(max(0, j - RADIUS), min(width, j + RADIUS + 1))
+            ):
+                moves.append((i, j))
+    return moves or [(height // 2, width // 2)]
+
+
+def search(board, k, mark, depth, alpha, beta, deadline, empty, win):
+    """
+    Alpha-beta search to the given depth; returns the board's value for X.
+    Wins found sooner (with more depth left) are worth more.
+    """
+    if time.perf_counter() > deadline:
+        raise TimeUp
+
+    maximizing = mark == X
+    other = O if maximizing else X
+    v = -math.inf if maximizing else math.inf
+    for i, j in candidate_moves(board):
+        board[i][j] = mark
+        if makes_line(board, (i, j), k):
+            score = (win + depth) if maximizing else -(win + depth)
+        elif empty == 1:
+            score = 0
+        elif depth == 1:
+            score = evaluate(board, k)
+        else:
+            score = search(board, k, other, depth - 1, alpha, beta,
+                           deadline, empty - 1, win)
+        board[i][j] = EMPTY
+
+        if maximizing:
+            v = max(v, score)
+            alpha = max(alpha, v)
+        else:
+            v = min(v, score)
+            beta = min(beta, v)
+        if alpha >= beta:
+            break
+    return v
+
+
+def best_move(board, k=3, budget=BUDGET):
+    """
+    Returns a move for the player to act on board, searching one ply deeper
+    each round until the budget (in seconds) runs out or, on a small board
+    where every move is searched, the game is solved. The move from the
+    deepest finished round is played.
+    """
+    if ttt.terminal(board, k):
+        return None
+
+    deadline = time.perf_counter() + budget
+    board = [row[:] for row in board]
+    mark = ttt.player(board)
+    other = O if mark == X else X
+    empty = sum(cell == EMPTY for row in board for cell in row)
+    win = 10 ** (k + 2)
+
+    moves = candidate_moves(board)
+    exhaustive = len(board) * len(board[0]) <= SMALL_BOARD
+    best = moves[0]
+    for depth in range(1, empty + 1):
+        try:
+            values = []
+            alpha, beta = -math.inf, math.inf
+            for i, j in moves:
+                board[i][j] = mark
+                if makes_line(board, (i, j), k):
+                    score = win + depth if mark == X else -(win + depth)
+                elif empty == 1:
+                    score = 0
+                elif depth == 1:
+                    score = evaluate(board, k)
+                else:
+                    score = search(board, k, other, depth - 1, alpha, beta,
+                                   deadline, empty - 1, win)
+                board[i][j] = EMPTY
+                values.append(score)
+                if mark == X:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+        except TimeUp:
+            break
+
+        # Try this round's best move first in the next round
+        pick = max if mark == X else min
+        index = values.index(pick(values))
+        best = moves[index]
+        moves.insert(0, moves.pop(index))
+        if exhaustive and abs(values[index]) >= win:
+            break
+    return best
+
+
+def main():
+    if len(sys.argv) not in [4, 5]:
+        sys.exit("Usage: python mnk.py height width k [budget]")
+    height, width, k = (int(arg) for arg in sys.argv[1:4])
+    budget = float(sys.argv[4]) if len(sys.argv) > 4 else BUDGET
+
+    # Self-play, printing the board after every move
+    game = Game(height, width, k)
+    board = game.initial_state()
+    while not game.terminal(board):
+        mark = game.player(board)
+        start = time.perf_counter()
+        move = game.best_move(board, budget)
+        board = game.result(board, move)
+        print(f"{mark} plays {move} in {time.perf_counter() - start:.2f}s")
+        for row in board:
+            print(" ".join(cell or "." for cell in row))
+        print()
+    print(f"Winner: {game.winner(board)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ import time
 
 import tictactoe as ttt
 
+from worker import MoveWorker
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -17,9 +19,12 @@ mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
+# The computer's move is shown no sooner than this many seconds
+THINKING_TIME = 0.5
+
 user = None
 board = ttt.initial_state()
-ai_turn = False
+ai = MoveWorker()
 
 while True:
 
@@ -102,21 +107,20 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            title = f"Computer thinking... {ai.elapsed():.1f}s"
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, computed in the background
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai.idle():
+                ai.start(board)
+            elif ai.elapsed() >= THINKING_TIME:
+                move = ai.result()
+                if move is not None:
+                    board = ttt.result(board, move)
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -141,6 +145,6 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
+                    ai.cancel()
 
     pygame.display.flip()
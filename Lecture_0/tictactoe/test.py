@@ -1,3 +1,5 @@
+import tictactoe
+
 from tictactoe import player, actions, result, winner, terminal, utility, max_value, min_value, minimax
 
 EMPTY = None
@@ -25,4 +27,10 @@ print(f"Terminal: {terminal(board)}\n")
 
 print(f"Best action: {minimax(board)}\n")
 
-
+# Compare how many positions each search mode visits from an opening move
+opening = tictactoe.result(tictactoe.initial_state(), (0, 0))
+for mode in ["plain", "memo", "alphabeta"]:
+    tictactoe.table.clear()
+    tictactoe.nodes = 0
+    move = minimax(opening, mode)
+    print(f"{mode}: {tictactoe.nodes} nodes, move {move}")
@@ -3,23 +3,241 @@ Tic Tac Toe Player
 """
 
 import math
-import copy
+import mmap
+import os
+import sys
+
+from collections import OrderedDict
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Most positions kept in the transposition table before evicting
+TABLE_SIZE = 100000
+
+# Directions a line can run in: across, down and both diagonals
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+# Static move ordering for alpha-beta: center, corners, then edges
+MOVE_ORDER = [(1, 1),
+              (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1)]
+
+# Killer moves remembered per ply
+KILLERS = 2
+
+# Number of positions visited by the last searches
+nodes = 0
+
+# Perfect-play table: one byte per base-3 board index holding the best
+# move's cell number, or NO_MOVE; build it with `python tictactoe.py`.
+# The file is not committed, and until it is built minimax searches instead
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perfect.bin")
+BOOK_SIZE = 3 ** 9
+NO_MOVE = 255
+book = None
+
+
+class TranspositionTable():
+    """
+    Bounded cache of search results keyed by an immutable board encoding.
+    When full, the least recently used entry is evicted.
+    """
+
+    def __init__(self, maxsize=TABLE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+table = TranspositionTable()
+
 
-def initial_state():
+# Bit masks of the 8 winning lines; cell (i, j) is bit 3 * i + j
+LINES = [0b000000111, 0b000111000, 0b111000000,
+         0b001001001, 0b010010010, 0b100100100,
+         0b100010001, 0b001010100]
+FULL = 0b111111111
+
+
+class Bitboard():
+    """
+    Immutable tic-tac-toe board stored as two 9-bit masks, one per player.
+
+    Indexing and iteration give rows of X, O and EMPTY like a list board, and
+    player, actions, result, winner, terminal and utility all accept it,
+    returning a Bitboard from result.
+    """
+
+    __slots__ = ("x", "o")
+
+    def __init__(self, x=0, o=0):
+        self.x = x
+        self.o = o
+
+    @classmethod
+    def from_board(cls, board):
+        x = o = 0
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell == X:
+                    x |= 1 << (3 * i + j)
+                elif cell == O:
+                    o |= 1 << (3 * i + j)
+        return cls(x, o)
+
+    def to_board(self):
+        return [list(row) for row in self]
+
+    def cell(self, i, j):
+        bit = 1 << (3 * i + j)
+        if self.x & bit:
+            return X
+        if self.o & bit:
+            return O
+        return EMPTY
+
+    def __getitem__(self, i):
+        return [self.cell(i, j) for j in range(3)]
+
+    def __iter__(self):
+        for i in range(3):
+            yield self[i]
+
+    def __eq__(self, other):
+        return (isinstance(other, Bitboard)
+                and self.x == other.x and self.o == other.o)
+
+    def __hash__(self):
+        return hash((self.x, self.o))
+
+    def __repr__(self):
+        return f"Bitboard({self.x:#011b}, {self.o:#011b})"
+
+    def is_valid(self):
+        xs = bin(self.x).count("1")
+        os = bin(self.o).count("1")
+        return not self.x & self.o and abs(xs - os) <= 1
+
+    def player(self):
+        return O if bin(self.empty()).count("1") % 2 == 0 else X
+
+    def empty(self):
+        return FULL & ~(self.x | self.o)
+
+    def actions(self):
+        empty = self.empty()
+        return {divmod(bit, 3) for bit in range(9) if empty >> bit & 1}
+
+    def result(self, action):
+        i, j = action
+        if not (0 <= i < 3 and 0 <= j < 3):
+            raise Exception("Invalid Action")
+        bit = 1 << (3 * i + j)
+        if (self.x | self.o) & bit:
+            raise Exception("Invalid Action")
+        if self.player() == X:
+            return Bitboard(self.x | bit, self.o)
+        return Bitboard(self.x, self.o | bit)
+
+    def winner(self):
+        # X is checked first, as in winner() for list boards
+        for mark, player in [(self.x, X), (self.o, O)]:
+            for line in LINES:
+                if mark & line == line:
+                    return player
+        return None
+
+
+def initial_state(height=3, width=3):
     """
     Returns starting state of the board.
     """
-    return [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
+    return [[EMPTY] * width for _ in range(height)]
+
+
+# The 8 symmetries of the board (rotations and reflections) as maps of (i, j)
+TRANSFORMS = [
+    lambda i, j: (i, j),
+    lambda i, j: (j, 2 - i),
+    lambda i, j: (2 - i, 2 - j),
+    lambda i, j: (2 - j, i),
+    lambda i, j: (i, 2 - j),
+    lambda i, j: (2 - i, j),
+    lambda i, j: (j, i),
+    lambda i, j: (2 - j, 2 - i),
+]
+
+
+def permutation_table(transform):
+    """Returns, for every 9-bit mask, the mask with transform applied."""
+    table = []
+    for mask in range(FULL + 1):
+        image = 0
+        for bit in range(9):
+            if mask >> bit & 1:
+                i, j = transform(*divmod(bit, 3))
+                image |= 1 << (3 * i + j)
+        table.append(image)
+    return table
+
+
+PERMUTATIONS = [permutation_table(transform) for transform in TRANSFORMS]
+
+# INVERSES[s] undoes symmetry s
+INVERSES = [
+    next(t for t in range(8) if TRANSFORMS[t](*TRANSFORMS[s](0, 1)) == (0, 1)
+         and TRANSFORMS[t](*TRANSFORMS[s](1, 0)) == (1, 0))
+    for s in range(8)
+]
+
+
+def canonical(board):
+    """
+    Returns (key, symmetry): key is the same for all 8 rotations and
+    reflections of the board, and symmetry is the index of the transform
+    that maps the board onto its canonical orientation.
+    """
+    if not isinstance(board, Bitboard):
+        board = Bitboard.from_board(board)
+    return min(
+        ((permute[board.x], permute[board.o]), symmetry)
+        for symmetry, permute in enumerate(PERMUTATIONS)
+    )
+
+
+def transform_action(action, symmetry):
+    """Maps action through the given symmetry."""
+    return TRANSFORMS[symmetry](*action)
 
 
 def is_valid_board(board):
+    if isinstance(board, Bitboard):
+        return int(board.is_valid())
     xs = sum(cell == X for row in board for cell in row)
     os = sum(cell == O for row in board for cell in row)
     if abs(xs - os) > 1:
@@ -31,29 +249,30 @@ def player(board):
     """
     Returns player who has the next turn on a board.
     """
-
-    # Initial game state
-    initial = all(cell == EMPTY for row in board for cell in row)
+    if isinstance(board, Bitboard):
+        if not board.is_valid():
+            raise Exception("Not valid board")
+        return board.player()
 
     # Check if valid board
     if not is_valid_board(board):
         raise Exception("Not valid board")
 
-    # Count empty fields
-    count_empty = sum(cell == EMPTY for row in board for cell in row)
-
-    if initial:
-        return X
-    if count_empty % 2 == 0:
-        return O
-    else:
+    # X moves first, so it is X's turn whenever both have moved equally often
+    xs = sum(cell == X for row in board for cell in row)
+    os = sum(cell == O for row in board for cell in row)
+    if xs == os:
         return X
+    return O
 
 
 def actions(board):
     """
     Returns set of all possible actions (i, j) available on the board.
     """
+    if isinstance(board, Bitboard):
+        return board.actions()
+
     # Check if valid board
     if not is_valid_board(board):
         raise Exception("Not valid board")
@@ -72,6 +291,9 @@ def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
+    if isinstance(board, Bitboard):
+        return board.result(action)
+
     # Check if valid board
     if not is_valid_board(board):
         raise Exception("Not valid board")
@@ -80,8 +302,8 @@ def result(board, action):
     if action not in actions(board):
         raise Exception("Invalid Action")
 
-    # Make copy
-    res_board = copy.deepcopy(board)
+    # Make copy (cells are immutable, so copying the rows is enough)
+    res_board = [row[:] for row in board]
 
     # Unpacking row and column from action tuple
     i, j = action
@@ -94,71 +316,123 @@ def result(board, action):
     return res_board
 
 
-def winner(board):
+def winner(board, k=3):
     """
-    Returns the winner of the game, if there is one.
+    Returns the winner of the game, if there is one: the player with k
+    marks in a row, column or diagonal. Boards may be any height and width;
+    a Bitboard is always 3x3 with k = 3.
     """
+    if isinstance(board, Bitboard):
+        return board.winner()
+
     # Check if valid board
     if not is_valid_board(board):
         raise Exception("Not valid board")
 
     # Check if any player has won
     for player in [X, O]:
-        # Horizontal
-        if any(all(cell == player for cell in row) for row in board):
-            return player
-        # Vertical
-        if any(all(board[i][j] == player for i in range(3)) for j in range(3)):
-            return player
-        # Diagonal
-        if all(board[i][i] == player for i in range(3)) or all(board[j][2-j] == player for j in range(3)):
-            return player
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell == player and any(
+                    line_length(board, (i, j), direction, k) >= k
+                    for direction in DIRECTIONS
+                ):
+                    return player
     return None
 
 
-def terminal(board):
+def line_length(board, cell, direction, limit):
+    """
+    Returns how many of the same mark run from cell in direction,
+    counting cell itself and stopping at limit.
+    """
+    i, j = cell
+    di, dj = direction
+    mark = board[i][j]
+    length = 1
+    while length < limit:
+        i, j = i + di, j + dj
+        if not (0 <= i < len(board) and 0 <= j < len(board[0])) or board[i][j] != mark:
+            break
+        length += 1
+    return length
+
+
+def terminal(board, k=3):
     """
     Returns True if game is over, False otherwise.
     """
-    if winner(board) == O or winner(board) == X:
+    if isinstance(board, Bitboard):
+        return board.winner() is not None or not board.empty()
+    if winner(board, k) == O or winner(board, k) == X:
         return True
     if not actions(board):
         return True
     return False
 
 
-def utility(board):
+def utility(board, k=3):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    if not terminal(board):
+    if not terminal(board, k):
         raise Exception("Not a terminal state")
-    if winner(board) == X:
+    if winner(board, k) == X:
         return 1
-    elif winner(board) == O:
+    elif winner(board, k) == O:
         return -1
     else:
         return 0
 
 
-def minimax(board):
+def minimax(board, mode="book"):
     """
     Returns the optimal action for the current player on the board.
+
+    By default (mode "book") the move is read from the perfect-play table
+    if it is loaded, falling back to "memo" search otherwise. With mode
+    "memo" positions are looked up in the transposition table before being
+    searched; "plain" searches the full tree every time; "alphabeta" uses
+    alpha-beta pruning with move ordering.
+
+    Only 3x3 boards are searched; use mnk.best_move for larger ones.
     """
-    best_action = None
-    depth = 0
+    if not isinstance(board, Bitboard) and (
+        len(board) != 3 or any(len(row) != 3 for row in board)
+    ):
+        raise Exception("minimax only plays 3x3 boards")
+
+    if mode not in ["book", "memo", "plain", "alphabeta"]:
+        raise Exception(f"unknown mode {mode}")
 
     if terminal(board):
         return None
 
-    if board == initial_state():
-        return (0, 0)
+    if mode == "book":
+        move = book_move(board)
+        if move is not None:
+            return move
+        mode = "memo"
+
+    if mode == "alphabeta":
+        return alphabeta_action(board)
+
+    cache = table if mode == "memo" else None
+    best_action = None
+    depth = 0
+
+    # Best moves are cached in canonical orientation and mapped back
+    if cache is not None:
+        key, symmetry = canonical(board)
+        move = cache.get(("move", key))
+        if move is not None:
+            return transform_action(move, INVERSES[symmetry])
 
     # best action for Player X
     if player(board) == X:
         cur_v = -2
         for action in actions(board):
-            action_v, depth = min_value(result(board, action), depth + 1)
+            action_v, depth = min_value(result(board, action), depth + 1, cache)
             if cur_v < action_v or (cur_v <= action_v and depth < best_depth):
                 best_action = action
                 best_depth = depth
@@ -168,28 +442,186 @@ def minimax(board):
     if player(board) == O:
         cur_v = 2
         for action in actions(board):
-            action_v, depth = max_value(result(board, action), depth)
+            action_v, depth = max_value(result(board, action), depth, cache)
             if cur_v > action_v or (cur_v >= action_v and depth < best_depth):
                 cur_v = action_v
                 best_action = action
                 best_depth = depth
 
+    if cache is not None:
+        cache.put(("move", key), transform_action(best_action, symmetry))
     return best_action
 
 
-def max_value(board, depth):
+def max_value(board, depth, cache=None):
+    global nodes
+    nodes += 1
+    if cache is not None:
+        key = ("max", canonical(board)[0])
+        v = cache.get(key)
+        if v is not None:
+            return v, depth
     if terminal(board):
-        return (utility(board), depth)
-    v = float('-inf')
-    for action in actions(board):
-        v = max(v, min_value(result(board, action), depth + 1)[0])
+        v = utility(board)
+    else:
+        v = float('-inf')
+        for action in actions(board):
+            v = max(v, min_value(result(board, action), depth + 1, cache)[0])
+    if cache is not None:
+        cache.put(key, v)
     return v, depth
 
 
-def min_value(board, depth):
+def min_value(board, depth, cache=None):
+    global nodes
+    nodes += 1
+    if cache is not None:
+        key = ("min", canonical(board)[0])
+        v = cache.get(key)
+        if v is not None:
+            return v, depth
     if terminal(board):
-        return (utility(board), depth)
-    v = float('inf')
-    for action in actions(board):
-        v = min(v, max_value(result(board, action), depth + 1)[0])
+        v = utility(board)
+    else:
+        v = float('inf')
+        for action in actions(board):
+            v = min(v, max_value(result(board, action), depth + 1, cache)[0])
+    if cache is not None:
+        cache.put(key, v)
     return v, depth
+
+
+def ordered_actions(board, killers, ply):
+    """
+    Returns the available actions, killer moves for this ply first,
+    then center, corners and edges.
+    """
+    available = actions(board)
+    moves = [move for move in killers.get(ply, []) if move in available]
+    moves += [move for move in MOVE_ORDER if move in available and move not in moves]
+    return moves
+
+
+def alphabeta(board, alpha=-math.inf, beta=math.inf, ply=0, killers=None):
+    """
+    Returns the value of the board for X under alpha-beta search.
+
+    A win is worth 1 + the number of empty cells left, so quicker wins
+    (and slower losses) score higher, like the depth tie-breaking of
+    minimax.
+    """
+    global nodes
+    nodes += 1
+    if killers is None:
+        killers = dict()
+
+    if terminal(board):
+        if isinstance(board, Bitboard):
+            empty = bin(board.empty()).count("1")
+        else:
+            empty = sum(cell == EMPTY for row in board for cell in row)
+        return utility(board) * (1 + empty)
+
+    maximizing = player(board) == X
+    v = -math.inf if maximizing else math.inf
+    for action in ordered_actions(board, killers, ply):
+        child = alphabeta(result(board, action), alpha, beta, ply + 1, killers)
+        if maximizing:
+            v = max(v, child)
+            alpha = max(alpha, v)
+        else:
+            v = min(v, child)
+            beta = min(beta, v)
+
+        # Cutoff: remember the move that caused it
+        if alpha >= beta:
+            moves = killers.setdefault(ply, [])
+            if action not in moves:
+                moves.insert(0, action)
+                del moves[KILLERS:]
+            break
+    return v
+
+
+def alphabeta_action(board):
+    """
+    Returns the best action on the board by alpha-beta search; among equally
+    good actions the first in move order is kept.
+    """
+    killers = dict()
+    maximizing = player(board) == X
+    best_action = None
+    best_v = -math.inf if maximizing else math.inf
+    for action in ordered_actions(board, killers, 0):
+        if maximizing:
+            v = alphabeta(result(board, action), best_v, math.inf, 1, killers)
+            if v > best_v:
+                best_v, best_action = v, action
+        else:
+            v = alphabeta(result(board, action), -math.inf, best_v, 1, killers)
+            if v < best_v:
+                best_v, best_action = v, action
+    return best_action
+
+
+def book_index(board):
+    """Returns the board's index in the perfect-play table."""
+    index = 0
+    for row in board:
+        for cell in row:
+            index = index * 3 + (1 if cell == X else 2 if cell == O else 0)
+    return index
+
+
+def book_move(board):
+    """Returns the table's move for board, or None if not available."""
+    if book is None:
+        return None
+    cell = book[book_index(board)]
+    if cell == NO_MOVE:
+        return None
+    return divmod(cell, 3)
+
+
+def build_book(filename=BOOK_FILE):
+    """
+    Solves every position reachable from the empty board and writes the
+    best move for each one as a table of BOOK_SIZE bytes.
+    """
+    moves = bytearray([NO_MOVE]) * BOOK_SIZE
+    seen = set()
+    stack = [Bitboard()]
+    while stack:
+        board = stack.pop()
+        if board in seen or terminal(board):
+            continue
+        seen.add(board)
+        i, j = alphabeta_action(board)
+        moves[book_index(board)] = 3 * i + j
+        stack.extend(result(board, action) for action in actions(board))
+
+    with open(filename, "wb") as f:
+        f.write(moves)
+    return len(seen)
+
+
+def load_book(filename=BOOK_FILE):
+    """
+    Memory-maps the perfect-play table so minimax can answer from it.
+    Leaves search in charge if the file is missing or the wrong size.
+    """
+    global book
+    book = None
+    if not os.path.exists(filename) or os.path.getsize(filename) != BOOK_SIZE:
+        return False
+    with open(filename, "rb") as f:
+        book = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return True
+
+
+load_book()
+
+
+if __name__ == "__main__":
+    filename = sys.argv[1] if len(sys.argv) > 1 else BOOK_FILE
+    print(f"Solved {build_book(filename)} positions into {filename}")
@@ -0,0 +1,161 @@
+"""
+Headless self-play tournament between tic-tac-toe engines.
+
+    python tournament.py [games] [workers] [engine ...]
+
+Every ordered pair of engines plays the given number of games (default
+100), spread over a process pool. Each game opens with OPENING random
+moves (by default X's first move, which cannot lose), so deterministic
+engines do not replay one game. Prints games per
+second, each engine's nodes per second and per-move latency percentiles,
+and a table of outcomes by pairing.
+"""
+
+import random
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations
+
+import tictactoe as ttt
+
+from mcts import MCTS
+
+GAMES = 100
+OPENING = 1
+SEED = 0
+MCTS_PLAYOUTS = 2000
+PERCENTILES = [50, 90, 99]
+
+# Built on first use in each pool worker
+mcts = None
+
+
+def searcher(mode, bitboard=False):
+    """Returns an engine that runs minimax with the given mode."""
+    def engine(board):
+        if bitboard:
+            board = ttt.Bitboard.from_board(board)
+        return ttt.minimax(board, mode), None
+    return engine
+
+
+def random_engine(board):
+    return random.choice(sorted(ttt.actions(board))), 0
+
+
+def mcts_engine(board):
+    global mcts
+    if mcts is None:
+        mcts = MCTS(playouts=MCTS_PLAYOUTS, seconds=10, workers=0)
+    move = mcts.best_move(board)
+    return move, mcts.searched
+
+# Engines return (move, nodes); None means count minimax's nodes
+ENGINES = {
+    "plain": searcher("plain"),
+    "memo": searcher("memo"),
+    "alphabeta": searcher("alphabeta"),
+    "bitboard": searcher("alphabeta", bitboard=True),
+    "book": searcher("book"),
+    "mcts": mcts_engine,
+    "random": random_engine,
+}
+
+
+def play(x, o, seed, opening=OPENING):
+    """
+    Plays one game between engines x and o. Returns the winner and a list
+    of (engine, seconds, nodes) for every engine move.
+    """
+    random.seed(seed)
+    board = ttt.initial_state()
+    moves = []
+    for _ in range(opening):
+        board = ttt.result(board, random.choice(sorted(ttt.actions(board))))
+
+    while not ttt.terminal(board):
+        name = x if ttt.player(board) == ttt.X else o
+        ttt.nodes = 0
+        start = time.perf_counter()
+        move, nodes = ENGINES[name](board)
+        seconds = time.perf_counter() - start
+        moves.append((name, seconds, ttt.nodes if nodes is None else nodes))
+        board = ttt.result(board, move)
+    return ttt.winner(board), moves
+
+
+def play_game(args):
+    x, o, seed = args
+    winner, moves = play(x, o, seed)
+    return x, o, winner, moves
+
+
+def percentile(values, p):
+    """Returns the p-th percentile of sorted values by nearest rank."""
+    index = max(0, -(-len(values) * p // 100) - 1)
+    return values[index]
+
+
+def tournament(engines, games=GAMES, workers=None):
+    """
+    Plays every ordered pairing and returns (outcomes, moves, seconds):
+    outcomes maps (x, o) to a count of winners and moves maps each engine
+    to its list of (seconds, nodes).
+    """
+    jobs = [
+        (x, o, SEED + n)
+        for x, o in permutations(engines, 2)
+        for n in range(games)
+    ]
+    outcomes = {pairing: {ttt.X: 0, ttt.O: 0, None: 0}
+                for pairing in permutations(engines, 2)}
+    moves = {name: [] for name in engines}
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for x, o, winner, played in executor.map(play_game, jobs, chunksize=16):
+            outcomes[x, o][winner] += 1
+            for name, seconds, nodes in played:
+                moves[name].append((seconds, nodes))
+    return outcomes, moves, time.perf_counter() - start
+
+
+def report(outcomes, moves, seconds):
+    games = sum(sum(counts.values()) for counts in outcomes.values())
+    print(f"{games} games in {seconds:.2f}s ({games / seconds:.1f} games/sec)\n")
+
+    header = f"{'engine':<10} {'moves':>7} {'nodes/sec':>12}"
+    header += "".join(f" {'p' + str(p) + ' ms':>9}" for p in PERCENTILES)
+    print(header + f" {'max ms':>9}")
+    for name, played in moves.items():
+        if not played:
+            continue
+        latencies = sorted(seconds for seconds, _ in played)
+        total = sum(latencies)
+        nodes = sum(count for _, count in played)
+        line = f"{name:<10} {len(played):>7} {nodes / total if total else 0:>12.0f}"
+        line += "".join(f" {percentile(latencies, p) * 1000:>9.3f}" for p in PERCENTILES)
+        print(line + f" {latencies[-1] * 1000:>9.3f}")
+
+    print(f"\n{'X':<10} {'O':<10} {'X wins':>7} {'O wins':>7} {'draws':>7}")
+    for (x, o), counts in outcomes.items():
+        print(f"{x:<10} {o:<10} {counts[ttt.X]:>7} {counts[ttt.O]:>7} {counts[None]:>7}")
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    engines = sys.argv[3:] or list(ENGINES)
+    for name in engines:
+        if name not in ENGINES:
+            sys.exit(f"Unknown engine: {name}. Choose from {', '.join(ENGINES)}")
+    if len(engines) < 2:
+        sys.exit("Usage: python tournament.py [games] [workers] [engine ...]")
+
+    report(*tournament(engines, games, workers))
+
+
+if __name__ == "__main__":
+    main()
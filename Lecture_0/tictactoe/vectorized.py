@@ -0,0 +1,80 @@
+"""
+Batch rules for many 3x3 boards at once with NumPy.
+
+Boards are rows of an N x 9 integer array in reading order, with 1 for X,
+-1 for O and 0 for an empty cell:
+
+    boards = to_array([board1, board2, ...])
+    winners, terminal, utilities, players = evaluate(boards)
+
+Every result is one array of length N, computed without a Python loop
+over the boards: each player's marks are packed into the same 9-bit masks
+Bitboard uses, and a 512-entry table says which masks hold a line.
+"""
+
+import numpy as np
+
+import tictactoe as ttt
+
+MARKS = {ttt.X: 1, ttt.O: -1, ttt.EMPTY: 0}
+
+# Bit value of each cell, as in Bitboard
+BITS = (1 << np.arange(9)).astype(np.int16)
+
+# WINS[mask] is True if mask contains a full line
+WINS = np.array([
+    any(mask & line == line for line in ttt.LINES) for mask in range(ttt.FULL + 1)
+])
+
+
+def to_array(boards):
+    """Returns an N x 9 array for a list of 3x3 boards."""
+    return np.array(
+        [[MARKS[cell] for row in board for cell in row] for board in boards],
+        dtype=np.int8,
+    ).reshape(-1, 9)
+
+
+def masks(boards, mark):
+    """Returns the 9-bit mask of the cells holding mark on every board."""
+    return (boards == mark).astype(np.int16) @ BITS
+
+
+def winners(boards):
+    """
+    Returns 1 where X has three in a row, -1 where O has, 0 otherwise.
+    On boards where both have, X wins, as in tictactoe.winner.
+    """
+    x_wins = WINS[masks(boards, 1)]
+    o_wins = WINS[masks(boards, -1)]
+    return np.where(x_wins, 1, np.where(o_wins, -1, 0)).astype(np.int8)
+
+
+def terminal(boards, won=None):
+    """Returns True for boards that are won or full."""
+    if won is None:
+        won = winners(boards)
+    return (won != 0) | (boards != 0).all(axis=1)
+
+
+def utilities(boards, won=None):
+    """
+    Returns 1 where X has won, -1 where O has, and 0 for draws. Boards that
+    are not terminal are also 0; mask them out with terminal().
+    """
+    if won is None:
+        won = winners(boards)
+    return won.copy()
+
+
+def players(boards):
+    """Returns 1 where X moves next and -1 where O does."""
+    xs = (boards == 1).sum(axis=1)
+    os = (boards == -1).sum(axis=1)
+    return np.where(xs == os, 1, -1).astype(np.int8)
+
+
+def evaluate(boards):
+    """Returns (winners, terminal, utilities, players) for every board."""
+    won = winners(boards)
+    return won, terminal(boards, won), utilities(boards, won), players(boards)
@@ -0,0 +1,88 @@
+"""
+Computes AI moves on a background thread, so the pygame loop in runner.py
+keeps drawing (and can show how long the computer has been thinking)
+while the search runs.
+"""
+
+import threading
+import time
+
+import tictactoe as ttt
+
+
+class MoveWorker():
+
+    def __init__(self, search=ttt.minimax):
+        self.search = search
+        self.lock = threading.Lock()
+
+        # Bumped by every start() and cancel(); a search only reports its
+        # move if no newer job has replaced it
+        self.job = 0
+        self.started = None
+        self.done = False
+        self.move = None
+        self.error = None
+
+    def start(self, board):
+        """Begins searching for a move on board, replacing any earlier search."""
+        with self.lock:
+            self.job += 1
+            job = self.job
+            self.started = time.perf_counter()
+            self.done = False
+            self.move = None
+            self.error = None
+        threading.Thread(target=self.run, args=(job, board), daemon=True).start()
+
+    def run(self, job, board):
+        move, error = None, None
+        try:
+            move = self.search(board)
+        except Exception as e:
+            error = e
+        with self.lock:
+            if job == self.job:
+                self.move, self.error, self.done = move, error, True
+
+    def cancel(self):
+        """
+        Forgets the current search. It may still finish in the background,
+        but its move is discarded.
+        """
+        with self.lock:
+            self.job += 1
+            self.started = None
+            self.done = False
+            self.move = None
+            self.error = None
+
+    def idle(self):
+        """Returns True if no search has been started since the last result."""
+        return self.started is None
+
+    def thinking(self):
+        return self.started is not None and not self.done
+
+    def elapsed(self):
+        """Returns the seconds spent on the current search."""
+        if self.started is None:
+            return 0.0
+        return time.perf_counter() - self.started
+
+    def result(self):
+        """
+        Returns the finished move, once, and makes the worker idle again.
+        Returns None while the search is still running.
+        """
+        with self.lock:
+            if not self.done:
+                return None
+            move, error = self.move, self.error
+            self.started = None
+            self.done = False
+            self.move = None
+            self.error = None
+        if error is not None:
+            raise error
+        return move
@@ -15,6 +15,20 @@ class Sentence():
         """Returns a set of all symbols in the logical sentence."""
         return set()
 
+    def expression(self, index):
+        """
+        Returns Python source evaluating the sentence over a list v of
+        truth values, where index maps each symbol to its position in v.
+        """
+        raise Exception("nothing to compile")
+
+    def compile(self, symbols=None):
+        """
+        Returns the sentence compiled for evaluation over a list of truth
+        values for symbols (by default, its own symbols in sorted order).
+        """
+        return Compiled(self, symbols)
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
@@ -68,6 +82,12 @@ class Symbol(Sentence):
     def symbols(self):
         return {self.name}
 
+    def expression(self, index):
+        try:
+            return f"v[{index[self.name]}]"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in symbols")
+
 
 class Not(Sentence):
     def __init__(self, operand):
@@ -92,6 +112,9 @@ class Not(Sentence):
     def symbols(self):
         return self.operand.symbols()
 
+    def expression(self, index):
+        return f"(not {self.operand.expression(index)})"
+
 
 class And(Sentence):
     def __init__(self, *conjuncts):
@@ -129,6 +152,13 @@ class And(Sentence):
     def symbols(self):
         return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
 
+    def expression(self, index):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(
+            conjunct.expression(index) for conjunct in self.conjuncts
+        ) + ")"
+
 
 class Or(Sentence):
     def __init__(self, *disjuncts):
@@ -160,6 +190,13 @@ class Or(Sentence):
     def symbols(self):
         return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
 
+    def expression(self, index):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(
+            disjunct.expression(index) for disjunct in self.disjuncts
+        ) + ")"
+
 
 class Implication(Sentence):
     def __init__(self, antecedent, consequent):
@@ -191,6 +228,11 @@ class Implication(Sentence):
     def symbols(self):
         return set.union(self.antecedent.symbols(), self.consequent.symbols())
 
+    def expression(self, index):
+        antecedent = self.antecedent.expression(index)
+        consequent = self.consequent.expression(index)
+        return f"((not {antecedent}) or {consequent})"
+
 
 class Biconditional(Sentence):
     def __init__(self, left, right):
@@ -224,40 +266,317 @@ class Biconditional(Sentence):
     def symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())
 
+    def expression(self, index):
+        left = self.left.expression(index)
+        right = self.right.expression(index)
+        return f"(bool({left}) == bool({right}))"
+
+
+class Compiled():
+    """
+    A sentence compiled into one Python function of a list of truth values,
+    one per symbol, in the order of self.symbols. Calling it skips the walk
+    over the sentence's objects and the lookups by symbol name that
+    evaluate() makes for every model.
+    """
+
+    def __init__(self, sentence, symbols=None):
+        if symbols is None:
+            symbols = sorted(sentence.symbols())
+        self.sentence = sentence
+        self.symbols = list(symbols)
+        index = {name: i for i, name in enumerate(self.symbols)}
+        try:
+            self.function = eval(f"lambda v: {sentence.expression(index)}")
+        except (SyntaxError, RecursionError, MemoryError):
+            # Too deeply nested for Python's compiler
+            self.function = lambda v: sentence.evaluate(dict(zip(self.symbols, v)))
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
-
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
-
-        # If model has an assignment for each symbol
-        if not symbols:
+    def __call__(self, values):
+        return self.function(values)
 
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
+    def evaluate(self, model):
+        """Evaluates the sentence in a model mapping symbol names to values."""
+        try:
+            return bool(self.function([bool(model[name]) for name in self.symbols]))
+        except KeyError as e:
+            raise Exception(f"variable {e.args[0]} not in model")
+
+
+class CNF():
+    """
+    Tseitin encoding of sentences into clauses for Solver.
+
+    Each symbol and each compound subsentence gets a numbered variable;
+    literals are variable numbers, negated for "not". Clauses tie every
+    compound variable to its operands, so the clause set is satisfiable
+    exactly when the added sentences are, and it grows linearly with
+    their size.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.variables = {}
+        self.literals = {}
+        self.count = 0
+        self.true = None
+
+    def new_variable(self):
+        self.count += 1
+        return self.count
+
+    def constant(self, value):
+        """Returns a literal that is always value."""
+        if self.true is None:
+            self.true = self.new_variable()
+            self.clauses.append([self.true])
+        return self.true if value else -self.true
+
+    def add(self, sentence):
+        """Adds clauses requiring sentence to be true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(disjunct)
+                                 for disjunct in sentence.disjuncts])
         else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """Returns the literal that is true exactly when sentence is."""
+        if isinstance(sentence, Symbol):
+            if sentence.name not in self.variables:
+                self.variables[sentence.name] = self.new_variable()
+            return self.variables[sentence.name]
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, And):
+            operands = [self.literal(conjunct) for conjunct in sentence.conjuncts]
+            if len(operands) < 2:
+                return operands[0] if operands else self.constant(True)
+            v = self.new_variable()
+            self.clauses.extend([-v, operand] for operand in operands)
+            self.clauses.append([v] + [-operand for operand in operands])
+        elif isinstance(sentence, (Or, Implication)):
+            if isinstance(sentence, Or):
+                operands = [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            else:
+                operands = [-self.literal(sentence.antecedent),
+                            self.literal(sentence.consequent)]
+            if len(operands) < 2:
+                return operands[0] if operands else self.constant(False)
+            v = self.new_variable()
+            self.clauses.append([-v] + operands)
+            self.clauses.extend([v, -operand] for operand in operands)
+        elif isinstance(sentence, Biconditional):
+            left = self.literal(sentence.left)
+            right = self.literal(sentence.right)
+            v = self.new_variable()
+            self.clauses.extend([
+                [-v, -left, right], [-v, left, -right],
+                [v, left, right], [v, -left, -right],
+            ])
+        else:
+            raise TypeError("must be a logical sentence")
 
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
-
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
-
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
-
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+        self.literals[sentence] = v
+        return v
+
+
+class Solver():
+    """
+    CDCL satisfiability solver: unit propagation over two watched literals
+    per clause, first-UIP clause learning with backjumping, and decisions
+    on the most active variable.
+    """
+
+    def __init__(self, clauses, count):
+        self.values = [0] * (count + 1)
+        self.levels = [0] * (count + 1)
+        self.reasons = [None] * (count + 1)
+        self.activity = [0.0] * (count + 1)
+        self.increment = 1.0
+        self.trail = []
+        self.decisions = []
+        self.head = 0
+        self.watches = {}
+        self.conflict = False
+
+        for clause in clauses:
+            clause = list(dict.fromkeys(clause))
+            if any(-literal in clause for literal in clause):
+                continue
+            if not clause:
+                self.conflict = True
+            elif len(clause) == 1:
+                if self.value(clause[0]) == -1:
+                    self.conflict = True
+                elif self.value(clause[0]) == 0:
+                    self.assign(clause[0], None)
+            else:
+                self.watch(clause)
+
+    def value(self, literal):
+        """Returns 1 if literal is true, -1 if false, 0 if unassigned."""
+        value = self.values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def watch(self, clause):
+        # Clauses are found under the negation of their first two literals
+        for literal in clause[:2]:
+            self.watches.setdefault(-literal, []).append(clause)
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = len(self.decisions)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """Assigns all implied literals; returns a conflicting clause or None."""
+        while self.head < len(self.trail):
+            literal = self.trail[self.head]
+            self.head += 1
+            false = -literal
+            watching = self.watches.get(literal, [])
+            kept = []
+            for index, clause in enumerate(watching):
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]) == 1:
+                    kept.append(clause)
+                    continue
+
+                # Look for another literal to watch
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches.setdefault(-clause[1], []).append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if self.value(clause[0]) == -1:
+                        self.watches[literal] = kept + watching[index + 1:]
+                        return clause
+                    self.assign(clause[0], clause)
+            self.watches[literal] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the learnt clause, with its asserting literal first, and
+        the level to jump back to.
+        """
+        level = len(self.decisions)
+        seen = set()
+        learnt = [None]
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for other in clause:
+                variable = abs(other)
+                if other == literal or variable in seen or self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump(variable)
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learnt.append(other)
+
+            # Resolve on the latest assigned literal of this level
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(literal)]
+        learnt[0] = -literal
+
+        back = 0
+        if len(learnt) > 1:
+            latest = max(range(1, len(learnt)), key=lambda i: self.levels[abs(learnt[i])])
+            learnt[1], learnt[latest] = learnt[latest], learnt[1]
+            back = self.levels[abs(learnt[1])]
+        return learnt, back
+
+    def bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+
+    def backjump(self, level):
+        """Undoes every assignment made above the given decision level."""
+        while len(self.trail) > self.decisions[level]:
+            variable = abs(self.trail.pop())
+            self.values[variable] = 0
+            self.reasons[variable] = None
+        del self.decisions[level:]
+        self.head = len(self.trail)
+
+    def solve(self):
+        """Returns True if the clauses are satisfiable."""
+        if self.conflict:
+            return False
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.decisions:
+                    return False
+                learnt, back = self.analyze(conflict)
+                self.backjump(back)
+                if len(learnt) > 1:
+                    self.watch(learnt)
+                self.assign(learnt[0], learnt)
+                self.increment /= 0.95
+                continue
+
+            free = [v for v in range(1, len(self.values)) if not self.values[v]]
+            if not free:
+                return True
+            variable = max(free, key=lambda v: self.activity[v])
+            self.decisions.append(len(self.trail))
+            self.assign(-variable, None)
+
+
+def satisfiable(sentence):
+    """Returns True if some model makes sentence true."""
+    cnf = CNF()
+    cnf.add(sentence)
+    return Solver(cnf.clauses, cnf.count).solve()
+
+
+def model_check(knowledge, query, method="sat"):
+    """
+    Checks if knowledge base entails query.
+
+    With method "sat" (the default) this holds exactly when knowledge and
+    not query cannot both be true, which the SAT solver decides; "enumerate"
+    checks every assignment of the symbols instead.
+    """
+    if method == "sat":
+        return not satisfiable(And(knowledge, Not(query)))
+    if method != "enumerate":
+        raise Exception(f"unknown method {method}")
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
-
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    knowledge = knowledge.compile(symbols)
+    query = query.compile(symbols)
+
+    # Query must be true in every model where knowledge base is true
+    return all(
+        query(model)
+        for model in itertools.product([True, False], repeat=len(symbols))
+        if knowledge(model)
+    )